@@ -7,6 +7,7 @@ from app.services.ai_loader import ai_manager
 from pydantic import BaseModel
 from typing import Optional, Dict
 from datetime import datetime
+import asyncio
 import base64
 import numpy as np
 import cv2
@@ -158,7 +159,8 @@ async def transcribe_audio(
     # Use audio service if available
     if ai_manager.audio:
         try:
-            transcription = ai_manager.audio.transcribe(audio_path)
+            # Long recordings take a while; keep the event loop free
+            transcription = await asyncio.to_thread(ai_manager.audio.transcribe, audio_path)
             return {
                 "interview_id": interview_id,
                 "transcription": transcription,
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Thread-safe, bounded in-memory LRU with hit/miss counters.
+    With `max_bytes` and a `sizeof(value)` function, entries are also evicted
+    to keep their total size under budget; larger values are not cached.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 0, sizeof: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        size = self.sizeof(value) if self.max_bytes > 0 and self.sizeof else 0
+        if self.max_bytes > 0 and size > self.max_bytes:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._total += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            while len(self._data) > self.max_entries or (self.max_bytes > 0 and self._total > self.max_bytes):
+                evicted, _ = self._data.popitem(last=False)
+                self._total -= self._sizes.pop(evicted, 0)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+            self._total -= self._sizes.pop(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._total = 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"entries": len(self._data), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+        if self.max_bytes > 0:
+            stats.update(bytes=self._total, max_bytes=self.max_bytes)
+        return stats
+
+
+class DiskCache:
+    """
+    JSON-on-disk cache with size-based eviction of least recently used entries.
+    Writes are atomic (tmp file + rename) so concurrent readers never see partial files.
+    """
+
+    suffix = ".json"
+
+    def _dumps(self, value: Any) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    def _loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # key -> size, rebuilt from disk so the budget survives restarts
+        self._sizes: Dict[str, int] = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(self.suffix):
+                    self._sizes[name[:-len(self.suffix)]] = os.path.getsize(os.path.join(root, name))
+        self._total = sum(self._sizes.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = self._loads(f.read())
+            os.utime(path)  # mtime doubles as last-access time for eviction
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            self.delete(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        data = self._dumps(value)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._total += len(data) - self._sizes.get(key, 0)
+            self._sizes[key] = len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._total -= self._sizes.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for key in list(self._sizes):
+            self.delete(key)
+
+    def _evict(self):
+        # Called with the lock held; drop oldest-accessed entries until back under budget
+        def last_access(key):
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:
+                return 0.0
+
+        for key in sorted(self._sizes, key=last_access):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            self._total -= self._sizes.pop(key)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._sizes),
+            "bytes": self._total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class BinaryDiskCache(DiskCache):
+    """DiskCache for raw bytes values (e.g. audio), stored as-is."""
+
+    suffix = ".bin"
+
+    def _dumps(self, value: bytes) -> bytes:
+        return value
+
+    def _loads(self, data: bytes) -> bytes:
+        return data
+
+
+class RedisCache:
+    """
+    JSON values in Redis under a key prefix, with an optional TTL.
+    Falls back to a no-op (always miss) if Redis is unreachable, like RedisManager does.
+    """
+
+    def __init__(self, url: str, prefix: str, ttl_seconds: Optional[int] = None):
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        try:
+            import redis
+
+            self.client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+            self.client.ping()
+        except Exception as e:
+            logger.warning(f"Redis cache '{prefix}' disabled: {e}")
+            self.client = None
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.client is None:
+            self.misses += 1
+            return None
+        try:
+            raw = self.client.get(f"{self.prefix}:{key}")
+        except Exception:
+            self.errors += 1
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any):
+        if self.client is None:
+            return
+        try:
+            self.client.set(f"{self.prefix}:{key}", json.dumps(value), ex=self.ttl_seconds)
+        except Exception:
+            self.errors += 1
+
+    def delete(self, key: str):
+        if self.client is None:
+            return
+        try:
+            self.client.delete(f"{self.prefix}:{key}")
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"connected": self.client is not None, "hits": self.hits, "misses": self.misses, "errors": self.errors}
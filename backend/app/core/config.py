@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "PRISM"
@@ -22,6 +22,151 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Resume analysis jobs
+    ANALYSIS_JOB_WORKERS: int = 4
+    ANALYSIS_JOB_TTL_SECONDS: int = 3600
+    ANALYSIS_JOB_MAX_FINISHED: int = 1000
+
+    # Bulk resume ingestion (per-stage concurrency)
+    BULK_PARSE_CONCURRENCY: int = 2
+    BULK_ANALYZE_CONCURRENCY: int = 2
+    BULK_EMBED_CONCURRENCY: int = 4
+    BULK_STORE_BATCH_SIZE: int = 32
+    BULK_STORE_FLUSH_SECONDS: float = 2.0
+
+    # LanceDB: table handles are opened once per process; writes are buffered and
+    # committed by one writer thread every LANCEDB_WRITE_BATCH_ROWS rows or
+    # LANCEDB_WRITE_FLUSH_SECONDS, whichever comes first
+    LANCEDB_PATH: str = "./lancedb_data"
+    LANCEDB_WRITE_BATCH_ROWS: int = 64
+    LANCEDB_WRITE_FLUSH_SECONDS: float = 1.0
+    LANCEDB_READ_CONSISTENCY_SECONDS: float = 5.0
+
+    # Docling parse cache
+    PDF_CACHE_DIR: str = "./cache/pdf"
+    PDF_CACHE_MEMORY_ENTRIES: int = 128
+    PDF_CACHE_DISK_MB: int = 512
+
+    # Text-layer fast path before Docling layout/OCR
+    PDF_FASTPATH_ENABLED: bool = True
+    PDF_FASTPATH_MIN_CHARS_PER_PAGE: int = 200
+
+    # Docling conversion worker pool (0 workers = convert in-process)
+    PDF_POOL_WORKERS: int = 2
+    PDF_POOL_MAX_DOCS_PER_CHILD: int = 50
+    PDF_POOL_MAX_RSS_MB: int = 2048
+    PDF_POOL_TIMEOUT_SECONDS: float = 120.0
+
+    # Large documents: only the first PDF_MAX_PAGES pages are parsed (0 = all),
+    # split into ranges of PDF_PAGE_CHUNK_SIZE pages converted in parallel (0 = no split)
+    PDF_MAX_PAGES: int = 10
+    PDF_PAGE_CHUNK_SIZE: int = 3
+
+    # Embedding cache: second tier is "redis", "disk" or "none"
+    EMBED_CACHE_MEMORY_ENTRIES: int = 4096
+    EMBED_CACHE_BACKEND: str = "disk"
+    EMBED_CACHE_TTL_SECONDS: int = 0
+    EMBED_CACHE_DIR: str = "./cache/embeddings"
+    EMBED_CACHE_DISK_MB: int = 256
+
+    # Embedding batching: max texts per backend call, and how long the
+    # micro-batcher waits to coalesce concurrent callers (0 = no coalescing)
+    EMBED_BATCH_SIZE: int = 32
+    EMBED_BATCH_WAIT_MS: float = 5.0
+
+    # Embedding backend: "ollama" (HTTP) or "onnx" (in-process, CPU)
+    EMBED_BACKEND: str = "ollama"
+    # Ollama endpoint: "embeddings" (one text per call, raw vectors: what the existing
+    # LanceDB tables hold) or "embed" (batched, L2-normalized). Switching to "embed" or to
+    # the onnx backend changes the vectors, so stored profiles and jobs must be re-embedded
+    OLLAMA_EMBED_ENDPOINT: str = "embeddings"
+    EMBED_DIM: int = 768
+    EMBED_ONNX_MODEL_PATH: str = "app/models/nomic-embed-text-v1.5/model.onnx"
+    EMBED_ONNX_TOKENIZER_PATH: str = "app/models/nomic-embed-text-v1.5/tokenizer.json"
+    EMBED_ONNX_MAX_LENGTH: int = 512
+    EMBED_ONNX_INTRA_OP_THREADS: int = 2
+    EMBED_ONNX_INTER_OP_THREADS: int = 1
+
+    # Async Ollama client: connection pool, embed concurrency and per-model timeouts
+    OLLAMA_MAX_CONNECTIONS: int = 32
+    OLLAMA_EMBED_CONCURRENCY: int = 4
+    OLLAMA_CHAT_TIMEOUT_SECONDS: float = 30.0
+    OLLAMA_ANALYSIS_TIMEOUT_SECONDS: float = 180.0
+    OLLAMA_EMBED_TIMEOUT_SECONDS: float = 30.0
+
+    # LLM scheduler: total generations in flight (match OLLAMA_NUM_PARALLEL),
+    # per-class caps, and how many seconds of waiting promote a request one class
+    LLM_MAX_IN_FLIGHT: int = 4
+    LLM_INTERACTIVE_MAX_IN_FLIGHT: int = 4
+    LLM_BATCH_MAX_IN_FLIGHT: int = 2
+    LLM_AGING_SECONDS: float = 10.0
+
+    # Model residency: per-model Ollama keep_alive; the chat model is pinned while
+    # interviews are live and released after OLLAMA_CHAT_PIN_IDLE_SECONDS of quiet
+    OLLAMA_KEEP_ALIVE_CHAT: str = "30m"
+    OLLAMA_KEEP_ALIVE_ANALYSIS: str = "10m"
+    OLLAMA_KEEP_ALIVE_EMBED: str = "30m"
+    OLLAMA_CHAT_PIN_IDLE_SECONDS: float = 300.0
+    OLLAMA_RESIDENCY_POLL_SECONDS: float = 5.0
+
+    # Map-reduce analysis: resumes longer than ANALYSIS_CHUNK_THRESHOLD_CHARS (0 = never)
+    # are split by section into at most ANALYSIS_MAX_CHUNKS chunks scored in parallel
+    ANALYSIS_CHUNK_THRESHOLD_CHARS: int = 8000
+    ANALYSIS_CHUNK_MAX_CHARS: int = 3000
+    ANALYSIS_MAX_CHUNKS: int = 6
+
+    # Interview sessions: server-side chat history. Recent turns are kept verbatim up to
+    # INTERVIEW_HISTORY_TOKEN_BUDGET; older turns are folded into a running summary
+    INTERVIEW_SESSION_TTL_SECONDS: int = 2 * 3600
+    INTERVIEW_MAX_SESSIONS: int = 1000
+    INTERVIEW_HISTORY_TOKEN_BUDGET: int = 1500
+    INTERVIEW_MIN_RECENT_MESSAGES: int = 4
+    INTERVIEW_SUMMARY_MAX_WORDS: int = 200
+
+    # Streaming voice input: VAD endpointing and partial transcript cadence
+    VOICE_VAD_THRESHOLD: float = 0.5
+    VOICE_VAD_MIN_SILENCE_SECONDS: float = 0.5
+    VOICE_VAD_MIN_SPEECH_SECONDS: float = 0.25
+    VOICE_VAD_MAX_SPEECH_SECONDS: float = 20.0
+    VOICE_PARTIAL_INTERVAL_SECONDS: float = 1.0
+
+    # Voice inference pools: one ONNX session per worker, with explicit thread counts
+    # (workers x intra-op threads should not exceed the cores reserved for voice)
+    VOICE_TTS_WORKERS: int = 2
+    VOICE_TTS_INTRA_OP_THREADS: int = 2
+    VOICE_TTS_INTER_OP_THREADS: int = 1
+    VOICE_STT_WORKERS: int = 2
+    VOICE_STT_THREADS: int = 2
+
+    # Long-form transcription of recorded interviews: decode processes (0 = half the
+    # cores), seconds of speech per decode batch, and the longest VAD segment
+    VOICE_TRANSCRIBE_WORKERS: int = 0
+    VOICE_TRANSCRIBE_THREADS_PER_WORKER: int = 1
+    VOICE_TRANSCRIBE_BATCH_SECONDS: float = 60.0
+    VOICE_TRANSCRIBE_MAX_SEGMENT_SECONDS: float = 20.0
+
+    # Synthesized-phrase (TTS) cache and the phrases pre-rendered at startup
+    VOICE_TTS_CACHE_MEMORY_ENTRIES: int = 256
+    VOICE_TTS_CACHE_MEMORY_MB: int = 64
+    VOICE_TTS_CACHE_DIR: str = "./cache/tts"
+    VOICE_TTS_CACHE_DISK_MB: int = 512
+    VOICE_TTS_WARMUP_PHRASES: List[str] = [
+        "Hi, I'm Aria. Thanks for joining me today!",
+        "Let's get started.",
+        "That's great, thank you for sharing.",
+        "Could you tell me a bit more about that?",
+        "Tell me about yourself and your background.",
+        "What interests you about this role?",
+        "Tell me about a challenging project you worked on.",
+        "Do you have any questions for me?",
+        "Thanks so much for your time today. We'll be in touch soon!",
+    ]
+
+    # analyze_resume result cache (TTL 0 = never expires)
+    ANALYSIS_CACHE_DIR: str = "./cache/analysis"
+    ANALYSIS_CACHE_DISK_MB: int = 256
+    ANALYSIS_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
     def model_post_init(self, __context):
         if not self.DATABASE_URL:
             self.DATABASE_URL = f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -1,16 +1,34 @@
-import os
-import lancedb
+import io
+import re
+import zipfile
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import json
 import asyncio
+import logging
+import itertools
+
+from app.core.config import settings
 
 # Import local services
 from app.services.pdf import pdf_service
+from app.services.pdf_pool import pdf_pool
 from app.services.brain import brain_service
+from app.services.llm_scheduler import llm_scheduler
+from app.services.model_residency import model_residency
 from app.services.voice import voice_service
+from app.services.voice_pipeline import speak_stream, build_transcriber, synthesize_sentences, warm_up
+from app.services.brain import ARIA_FALLBACK_REPLY
+from app.services.audio_codec import negotiate, wav_stream_header, float32_to_pcm16
+from app.services.analysis_jobs import analysis_jobs
+from app.services.bulk_ingest import bulk_ingest, iter_zip_pdfs
+from app.services.interview_sessions import interview_sessions
+from app.services.cancellation import ConnectionScope, cancellation_stats
+from app.services.transcription import long_form_transcriber
+from app.services.vector_store import lance_tables, lance_writer
 
 from app.api.endpoints import router as api_router
 from app.routers.proctor import router as proctor_router
@@ -22,6 +40,7 @@ from app.scripts.pull_models import pull_models
 from app.scripts.download_voice_models import main as download_voice_models
 
 app = FastAPI(title="PRISM Backend", version="2.0.0")
+logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
@@ -39,6 +58,23 @@ async def startup_event():
     # Download Voice Models (blocking - needed for startup if missing)
     asyncio.create_task(asyncio.to_thread(download_voice_models))
 
+    # Pre-render Aria's recurring phrases into the TTS cache
+    asyncio.create_task(asyncio.to_thread(warm_up, settings.VOICE_TTS_WARMUP_PHRASES + [ARIA_FALLBACK_REPLY]))
+
+    # Spawn Docling worker processes so their models load before the first upload
+    pdf_pool.start()
+
+    # Track resident Ollama models and release the chat pin once interviews go idle
+    app.state.model_residency_task = asyncio.create_task(model_residency.run(brain_service.async_client))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.model_residency_task.cancel()
+    pdf_pool.shutdown()
+    long_form_transcriber.shutdown()
+    # Commit rows still buffered in the write-behind writer
+    await asyncio.to_thread(lance_writer.shutdown)
+
 # Setup CORS
 app.add_middleware(
     CORSMiddleware,
@@ -52,59 +88,165 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api")
 app.include_router(proctor_router, prefix="/api")
 
-# Initialize LanceDB
-DB_PATH = "./lancedb_data"
-if not os.path.exists(DB_PATH):
-    os.makedirs(DB_PATH)
-db = lancedb.connect(DB_PATH)
-
 # Models
 class ChatRequest(BaseModel):
-    history: List[dict]
     user_input: str
+    # Server-side session; when omitted a new one is started (seeded from `history`)
+    session_id: Optional[str] = None
+    history: List[dict] = []
+
+class WarmupRequest(BaseModel):
+    phrases: List[str]
+    voice: Optional[str] = "af_heart"
 
 class SpeakRequest(BaseModel):
     text: str
     voice: Optional[str] = "af_heart"
+    # Stream the WAV sentence by sentence (chunked transfer) instead of one body
+    stream: bool = False
 
 @app.get("/")
 async def root():
     return {"status": "online", "engine": "Ollama + LanceDB"}
 
+def store_candidates(rows: List[dict]):
+    """
+    Appends analyzed resumes to the LanceDB candidates table.
+    Blocks until the write-behind commit holding them has landed.
+    """
+    lance_writer.write("candidates", rows).result()
+
+async def store_candidate(vector: list, markdown_text: str, briefing: str):
+    await asyncio.wrap_future(lance_writer.write("candidates", [{"vector": vector, "text": markdown_text, "briefing": briefing}]))
+
+@app.get("/api/ai/stats")
+async def ai_stats():
+    """
+    Cache and queue counters for the AI services.
+    """
+    return {
+        "pdf": {"cache": pdf_service.cache_stats(), "tiers": pdf_service.tier_stats(), "pool": pdf_pool.stats()},
+        "analysis": {"cache": brain_service.analysis_cache_stats()},
+        "llm_scheduler": llm_scheduler.stats(),
+        "models": model_residency.stats(),
+        "voice": {"tts_cache": voice_service.tts_cache_stats(), "pools": voice_service.pool_stats()},
+        "interview_sessions": interview_sessions.stats(),
+        "lancedb": lance_writer.stats(),
+        "cancellation": cancellation_stats.stats(),
+        "embeddings": {"cache": brain_service.embed_cache_stats(), "batching": brain_service.embed_batch_stats()},
+    }
+
+@app.get("/api/ai/models")
+async def ai_models():
+    """
+    Resident Ollama models, keep-alive policy and load/unload counters.
+    """
+    return model_residency.stats()
+
 @app.post("/api/analyze")
-async def analyze_candidate(file: UploadFile = File(...), job_description: str = Form(...)):
+async def analyze_candidate(file: UploadFile = File(...), job_description: str = Form(...), force: bool = Form(False)):
     """
     Endpoint for uploading a resume and getting an AI analysis.
+    Runs on the analysis job pipeline so the event loop stays free while it waits.
+    Repeat (resume, job) pairs are served from the analysis cache unless force=true.
     """
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
+    content = await file.read()
+    job = analysis_jobs.submit(file.filename, content, job_description, store_candidate, force)
     try:
-        # 1. Read file bytes
-        content = await file.read()
-        
-        # 2. Parse PDF to Markdown using Docling
-        markdown_text = pdf_service.parse_resume(content)
-        
-        # 3. Analyze with Phi-3.5
-        analysis = brain_service.analyze_resume(markdown_text, job_description)
-        
-        # 4. Generate Embedding and Upsert to LanceDB
-        vector = brain_service.embed_text(markdown_text)
-        table_name = "candidates"
-        if table_name not in db.table_names():
-            db.create_table(table_name, data=[{"vector": vector, "text": markdown_text, "briefing": analysis["candidate_briefing"]}])
+        job = await analysis_jobs.wait(job["job_id"])
+    finally:
+        # Nobody polls this job; don't keep it around for the TTL
+        analysis_jobs.discard(job["job_id"])
+
+    if job["status"] != "completed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    return job["result"]
+
+@app.post("/api/analyze/jobs", status_code=202)
+async def submit_analysis_job(file: UploadFile = File(...), job_description: str = Form(...), force: bool = Form(False)):
+    """
+    Queues a resume analysis and returns a job id right away.
+    Poll GET /api/analyze/jobs/{job_id} or subscribe to the WebSocket for progress.
+    """
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    content = await file.read()
+    return analysis_jobs.submit(file.filename, content, job_description, store_candidate, force)
+
+@app.delete("/api/analyze/cache")
+async def clear_analysis_cache():
+    """
+    Drops every cached resume analysis.
+    """
+    brain_service.invalidate_analysis()
+    return {"status": "cleared"}
+
+@app.delete("/api/analyze/cache/{cache_key}")
+async def invalidate_analysis(cache_key: str):
+    """
+    Drops one cached analysis (the `analysis_cache_key` returned with job results).
+    """
+    if not re.fullmatch(r"[0-9a-f]{64}", cache_key):
+        raise HTTPException(status_code=400, detail="Invalid cache key")
+    brain_service.invalidate_analysis(cache_key)
+    return {"status": "invalidated", "cache_key": cache_key}
+
+@app.get("/api/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+    Returns job status, per-stage status and (once completed) the analysis result.
+    """
+    job = analysis_jobs.snapshot(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.websocket("/api/analyze/jobs/{job_id}/ws")
+async def analysis_job_websocket(websocket: WebSocket, job_id: str):
+    """
+    Pushes a job snapshot on every stage transition, then closes.
+    """
+    await websocket.accept()
+    if not analysis_jobs.snapshot(job_id):
+        await websocket.send_json({"error": "Job not found"})
+        await websocket.close()
+        return
+
+    try:
+        async for snapshot in analysis_jobs.watch(job_id):
+            await websocket.send_json(snapshot)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@app.post("/api/analyze/bulk")
+async def analyze_bulk(files: List[UploadFile] = File(...), job_description: str = Form(...), force: bool = Form(False)):
+    """
+    Bulk resume ingestion. Accepts any mix of PDFs and ZIP archives of PDFs and
+    streams one NDJSON line per file as it is stored, then a summary line.
+    """
+    sources = []
+    for upload in files:
+        name = upload.filename or ""
+        content = await upload.read()
+        if name.lower().endswith(".zip"):
+            if not zipfile.is_zipfile(io.BytesIO(content)):
+                raise HTTPException(status_code=400, detail=f"Invalid ZIP archive: {name}")
+            sources.append(iter_zip_pdfs(content))
+        elif name.lower().endswith(".pdf"):
+            sources.append([(name, content)])
         else:
-            table = db.open_table(table_name)
-            table.add([{"vector": vector, "text": markdown_text, "briefing": analysis["candidate_briefing"]}])
-        
-        return {
-            "filename": file.filename,
-            "markdown": markdown_text,
-            "analysis": analysis
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {name}")
+
+    async def stream():
+        async for result in bulk_ingest.run(itertools.chain.from_iterable(sources), job_description, store_candidates, force):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @app.get("/api/feed/recommend")
 async def recommend_jobs(query: str, limit: int = 10):
@@ -112,13 +254,11 @@ async def recommend_jobs(query: str, limit: int = 10):
     Hybrid search for jobs based on a natural language query.
     """
     try:
-        query_vector = brain_service.embed_text(query)
-        table_name = "jobs"
-        
-        if table_name not in db.table_names():
+        query_vector = await brain_service.embed_text_async(query)
+        table = lance_tables.get("jobs")
+        if table is None:
             return {"results": []}
-            
-        table = db.open_table(table_name)
+
         # LanceDB Vector Search
         results = table.search(query_vector).limit(limit).to_list()
         
@@ -126,51 +266,211 @@ async def recommend_jobs(query: str, limit: int = 10):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/interview/sessions", status_code=201)
+async def create_interview_session():
+    """
+    Starts a server-side interview session. Pass the returned session_id with each chat turn.
+    """
+    session = interview_sessions.open()
+    return {"session_id": session.session_id}
+
+@app.get("/api/interview/sessions/{session_id}")
+async def get_interview_session(session_id: str):
+    session = interview_sessions.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.snapshot()
+
+@app.delete("/api/interview/sessions/{session_id}")
+async def delete_interview_session(session_id: str):
+    if not interview_sessions.close(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"deleted": session_id}
+
 @app.post("/api/interview/chat")
 async def interview_chat(request: ChatRequest):
     """
     Endpoint for interacting with Aria.
+    History is kept server-side per session_id, summarized to stay within a token budget.
+    """
+    session = interview_sessions.open(request.session_id, request.history)
+    async with session.lock:
+        reply = await brain_service.chat_with_aria_async(session.history(), request.user_input)
+        interview_sessions.record(session, request.user_input, reply)
+    return {"reply": reply, "session_id": session.session_id}
+
+@app.post("/api/interview/chat/stream")
+async def interview_chat_stream(request: ChatRequest):
     """
-    reply = brain_service.chat_with_aria(request.history, request.user_input)
-    return {"reply": reply}
+    Streams Aria's reply as server-sent events: one `token` event per chunk,
+    then a `done` event carrying the full reply and the session_id.
+    """
+    session = interview_sessions.open(request.session_id, request.history)
+
+    async def events():
+        reply = []
+        async with session.lock:
+            async for token in brain_service.stream_chat_with_aria(session.history(), request.user_input):
+                reply.append(token)
+                yield f"event: token\ndata: {json.dumps({'token': token})}\n\n"
+            interview_sessions.record(session, request.user_input, ''.join(reply))
+        yield f"event: done\ndata: {json.dumps({'reply': ''.join(reply), 'session_id': session.session_id})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so tokens reach the browser immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/api/interview/speak")
 async def interview_speak(request: SpeakRequest):
     """
     Endpoint for text-to-speech.
+    With stream=true the WAV is sent as it is synthesized, one sentence per chunk,
+    so playback starts after the first sentence.
     """
-    audio_data = voice_service.speak(request.text, voice=request.voice)
+    if request.stream:
+        return await stream_speech(request.text, request.voice)
+
+    audio_data = await voice_service.speak_async(request.text, voice=request.voice)
     if not audio_data:
         raise HTTPException(status_code=500, detail="Failed to generate audio")
     
     return Response(content=audio_data, media_type="audio/wav")
 
+@app.post("/api/interview/speak/warmup")
+async def interview_speak_warmup(request: WarmupRequest):
+    """
+    Pre-renders phrases into the TTS cache so later turns using them cost nothing to voice.
+    """
+    rendered = await asyncio.to_thread(warm_up, request.phrases, request.voice)
+    return {"phrases": len(request.phrases), "synthesized": rendered}
+
+async def stream_speech(text: str, voice: str) -> StreamingResponse:
+    sentences = synthesize_sentences(text, voice)
+    # Synthesize the first sentence up front so failures still surface as a 500
+    try:
+        samples, sample_rate = await sentences.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=400, detail="Nothing to synthesize")
+    except Exception as e:
+        await sentences.aclose()
+        raise HTTPException(status_code=500, detail=f"Failed to generate audio: {e}")
+
+    async def chunks():
+        try:
+            yield wav_stream_header(sample_rate) + float32_to_pcm16(samples)
+            async for more, _ in sentences:
+                yield float32_to_pcm16(more)
+        except Exception as e:
+            # Headers are already sent; end the stream early
+            logger.error(f"Speech stream error: {e}")
+        finally:
+            await sentences.aclose()
+
+    return StreamingResponse(chunks(), media_type="audio/wav", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.websocket("/api/interview/ws")
 async def interview_websocket(websocket: WebSocket):
     """
     WebSocket for real-time audio interaction.
-    Flow: User Audio Blob -> Moonshine (STT) -> Llama (Reply) -> Kokoro (TTS) -> AI Audio Blob
+    Flow: User Audio -> Moonshine (STT) -> Llama (streamed) -> Kokoro per sentence -> AI Audio Blobs
+    Input modes:
+    - default: each binary frame is a complete audio file (any format soundfile reads).
+    - ?input=stream: binary frames are small audio chunks, PCM16 (`codec=pcm16`, any
+      `sample_rate` / `channels`, resampled and downmixed to 16 kHz mono) or one Opus
+      packet per frame (`codec=opus`). Server-side VAD finds the end of each utterance,
+      sending `partial` JSON messages while the candidate speaks. A {"type": "end"}
+      text message flushes buffered speech.
+    Output audio is WAV per sentence by default; `output=pcm16|opus` (with optional
+    `output_sample_rate`) sends raw PCM16, or Opus packets each prefixed by a uint16 LE length.
+    On connect the server sends a `ready` JSON message with the negotiated formats.
+    Per turn the server sends a `transcript` JSON message, then for each sentence a
+    `sentence` JSON message followed by its audio as a binary frame, then `turn_end`.
+    Pass ?session_id=... to resume a server-side session; otherwise one is started per socket.
+    Replies run as tasks owned by the connection, so a disconnect cancels the LLM stream
+    and any queued Kokoro / Moonshine work for this client straight away.
     """
+    session = interview_sessions.open(websocket.query_params.get("session_id"))
+    transcriber = build_transcriber() if websocket.query_params.get("input") == "stream" else None
     await websocket.accept()
     try:
-        while True:
-            # Receive audio blob
-            data = await websocket.receive_bytes()
-            
-            # 1. Listen (STT)
-            text = voice_service.listen(data)
-            
-            if text:
-                # 2. Chat (Brain)
-                # Note: In a real app, you'd manage session history properly
-                reply = brain_service.chat_with_aria([], text)
-                
-                # 3. Speak (TTS)
-                audio_reply = voice_service.speak(reply)
-                
-                # 4. Send back audio
-                await websocket.send_bytes(audio_reply)
-                
+        decoder, encoder, formats = negotiate(dict(websocket.query_params))
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1003)
+        return
+    await websocket.send_json({"type": "ready", "session_id": session.session_id, **formats})
+
+    # Replies run alongside the receive loop; every write goes through this lock so
+    # messages from different turns never interleave
+    send_lock = asyncio.Lock()
+
+    async def send_json(payload: dict):
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    async def send_sentence(index: int, sentence: str, wav: bytes):
+        # The sentence message and its audio frame must stay adjacent
+        async with send_lock:
+            await websocket.send_json({"type": "sentence", "index": index, "text": sentence})
+            await websocket.send_bytes(wav)
+
+    async def respond(text: str):
+        # Chat, speak and send concurrently, one sentence at a time; turns queue on the lock
+        try:
+            async with session.lock:
+                reply = await speak_stream(
+                    brain_service.stream_chat_with_aria(session.history(), text), send_sentence, encode=encoder.encode
+                )
+                interview_sessions.record(session, text, reply)
+            await send_json({"type": "turn_end", "reply": reply})
+        except Exception as e:
+            logger.error(f"Interview reply failed: {e!r}")
+            try:
+                await send_json({"type": "error", "detail": "Failed to generate a reply"})
+            except Exception:
+                pass  # Socket already gone
+
+    try:
+        # Keep the chat model pinned in memory while the interview is live
+        async with model_residency.interview(), ConnectionScope("interview") as scope:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+
+                if transcriber is None:
+                    # Whole audio blob -> Moonshine (STT)
+                    if not message.get("bytes"):
+                        continue
+                    text = await voice_service.listen_async(message["bytes"])
+                    events = [{"type": "transcript", "text": text}] if text else []
+                elif message.get("bytes"):
+                    try:
+                        samples = decoder.decode(message["bytes"])
+                    except ValueError as e:
+                        await send_json({"type": "error", "detail": str(e)})
+                        continue
+                    events = await transcriber.accept(samples)
+                elif message.get("text"):
+                    try:
+                        control = json.loads(message["text"])
+                    except ValueError:
+                        await send_json({"type": "error", "detail": "Invalid control message"})
+                        continue
+                    if not isinstance(control, dict) or control.get("type") != "end":
+                        continue
+                    events = await transcriber.flush()
+                else:
+                    continue
+
+                for event in events:
+                    await send_json(event)
+                    if event["type"] == "transcript":
+                        scope.spawn(respond(event["text"]))
+
     except WebSocketDisconnect:
         print("Interview WebSocket disconnected")
     except Exception as e:
@@ -185,15 +485,11 @@ async def ingest_profile(profile_data: dict):
     try:
         # Generate vector from bio/experience
         text_for_embedding = f"{profile_data.get('name')} {profile_data.get('bio')} {profile_data.get('skills')}"
-        vector = brain_service.embed_text(text_for_embedding)
+        vector = await brain_service.embed_text_async(text_for_embedding)
         
-        table_name = "profiles"
-        if table_name not in db.table_names():
-            db.create_table(table_name, data=[{"vector": vector, "data": profile_data}])
-        else:
-            table = db.open_table(table_name)
-            table.add([{"vector": vector, "data": profile_data}])
-            
+        # Acknowledged once the batched commit holding the row has landed
+        await asyncio.wrap_future(lance_writer.write("profiles", [{"vector": vector, "data": profile_data}]))
+
         return {"status": "success", "profile_id": profile_data.get('id')}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, WebSocket, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, UploadFile, File, Form, HTTPException
 import os
+import asyncio
 import json
 import base64
 import cv2
@@ -8,6 +9,7 @@ import logging
 from typing import Dict, Any, List
 from app.services.sentinel_identity import sentinel_identity, UPLOAD_DIR
 from app.services.sentinel_loop import sentinel_loop
+from app.services.cancellation import ConnectionScope, WorkCancelled
 
 router = APIRouter(prefix="/proctor", tags=["proctor"])
 logger = logging.getLogger(__name__)
@@ -51,28 +53,16 @@ async def initiate_handshake(candidate_id: str = Form(...), session_id: str = Fo
 
 @router.websocket("/ws/sentinel")
 async def sentinel_websocket(websocket: WebSocket):
+    """
+    Frames are analysed one at a time off the event loop. The CV models are shared by
+    all connections and run one call at a time, so a frame that arrives while this
+    connection's previous frame is still waiting for or using them is dropped, and a
+    slow CV step never builds a backlog. On disconnect, the frame in flight is cancelled.
+    """
     await websocket.accept()
-    try:
-        while True:
-            data = await websocket.receive_text()
-            msg = json.loads(data)
-            
-            msg_type = msg.get("type")
-            session_id = msg.get("session_id")
-            
-            if not msg.get("frame"):
-                continue
-
-            # Decode base64 frame
-            try:
-                header, encoded = msg["frame"].split(",", 1)
-                img_data = base64.b64decode(encoded)
-                nparr = np.frombuffer(img_data, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            except Exception as e:
-                logger.error(f"Frame decoding failed: {e}")
-                continue
 
+    async def analyse(msg_type: str, session_id: str, frame: np.ndarray):
+        try:
             if msg_type == "handshake_frame":
                 # Multi-angle liveness handshake
                 result = await sentinel_identity.verify_handshake(session_id, frame)
@@ -80,16 +70,45 @@ async def sentinel_websocket(websocket: WebSocket):
                     "type": "handshake_result",
                     "data": result
                 })
-            
+
             elif msg_type == "proctor_frame":
                 # Real-time interview proctoring
-                response = sentinel_loop.process_frame(session_id, frame)
+                response = await asyncio.to_thread(sentinel_loop.process_frame, session_id, frame)
                 await websocket.send_json({
                     "type": "proctor_update",
                     "data": response
                 })
+        except WorkCancelled:
+            pass
+        except Exception as e:
+            logger.error(f"Frame analysis failed: {e}")
+
+    try:
+        async with ConnectionScope("proctor") as scope:
+            while True:
+                data = await websocket.receive_text()
+                msg = json.loads(data)
+
+                msg_type = msg.get("type")
+                session_id = msg.get("session_id")
+
+                if not msg.get("frame") or scope.busy:
+                    continue
+
+                # Decode base64 frame
+                try:
+                    header, encoded = msg["frame"].split(",", 1)
+                    img_data = base64.b64decode(encoded)
+                    nparr = np.frombuffer(img_data, np.uint8)
+                    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                except Exception as e:
+                    logger.error(f"Frame decoding failed: {e}")
+                    continue
+
+                scope.spawn(analyse(msg_type, session_id, frame))
 
+    except WebSocketDisconnect:
+        logger.info("Sentinel WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-    finally:
         await websocket.close()
@@ -14,6 +14,8 @@ KOKORO_MODEL_URL = "https://github.com/thewh1teagle/kokoro-onnx/releases/downloa
 # Version 0.5.0 of kokoro-onnx uses voices.bin (numpy format)
 VOICES_URL = "https://github.com/thewh1teagle/kokoro-onnx/releases/download/model-files/voices.bin"
 MOONSHINE_URL = "https://github.com/k2-fsa/sherpa-onnx/releases/download/asr-models/sherpa-onnx-moonshine-tiny-en-int8.tar.bz2"
+# Silero VAD, used to endpoint streaming voice input
+SILERO_VAD_URL = "https://github.com/k2-fsa/sherpa-onnx/releases/download/asr-models/silero_vad.onnx"
 
 def download_file(url, target_path, force=False):
     if os.path.exists(target_path) and not force:
@@ -64,6 +66,9 @@ def main():
     download_file(KOKORO_MODEL_URL, os.path.join(MODELS_DIR, "kokoro-v0_19.onnx"))
     download_file(VOICES_URL, os.path.join(MODELS_DIR, "voices.bin"))
 
+    # Silero VAD
+    download_file(SILERO_VAD_URL, os.path.join(MODELS_DIR, "silero_vad.onnx"))
+
     # Moonshine - check for critical files
     files_needed = ["encode.int8.onnx", "preprocess.onnx", "tokens.txt", "uncached_decode.int8.onnx"]
     moonshine_missing = any(not os.path.exists(os.path.join(MOONSHINE_DIR, f)) for f in files_needed)
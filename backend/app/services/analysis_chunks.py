@@ -0,0 +1,118 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def split_sections(markdown: str) -> List[str]:
+    """Splits a markdown resume at headings, keeping each heading with its body."""
+    sections: List[List[str]] = [[]]
+    for line in markdown.splitlines():
+        if _HEADING_RE.match(line) and any(l.strip() for l in sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+    return [s for s in ("\n".join(lines).strip() for lines in sections) if s]
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """Breaks a section longer than max_chars at line boundaries, hard-cutting very long lines."""
+    pieces: List[str] = []
+    current = ""
+    for block in section.splitlines():
+        while len(block) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(block[:max_chars])
+            block = block[max_chars:]
+        if current and len(current) + len(block) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{block}" if current else block
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def chunk_resume(markdown: str, max_chars: int, max_chunks: int) -> List[str]:
+    """
+    Packs resume sections into at most `max_chunks` chunks of at most `max_chars`.
+    Adjacent short sections share a chunk; text beyond the cap is dropped so the
+    number and size of map calls (and therefore latency) stay bounded.
+    """
+    chunks: List[str] = []
+    current = ""
+    for section in split_sections(markdown):
+        for piece in _split_oversized(section, max_chars) if len(section) > max_chars else [section]:
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+
+    if len(chunks) > max_chunks:
+        dropped = sum(len(c) for c in chunks[max_chunks:])
+        logger.warning(f"Resume exceeds {max_chunks} chunks; ignoring the last {dropped} characters")
+        chunks = chunks[:max_chunks]
+    return chunks
+
+
+def _dedupe(items: List[Any], limit: int) -> List[str]:
+    seen, result = set(), []
+    for item in items:
+        text = str(item).strip()
+        if text and text.lower() not in seen:
+            seen.add(text.lower())
+            result.append(text)
+    return result[:limit]
+
+
+def _relevance(value: Any) -> Optional[float]:
+    """A chunk's relevance as a number: 85, "85" and "85%" all work; "high" does not."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER_RE.search(value)
+        return float(match.group()) if match else None
+    return None
+
+
+def normalize_chunk_note(note: Any, chars: int) -> Optional[Dict[str, Any]]:
+    """
+    Coerces one map output into the shape the reduce step expects, or None if it
+    is not a JSON object. Relevance that is not numeric becomes None, and
+    strengths / red flags that are not lists are dropped.
+    """
+    if not isinstance(note, dict):
+        return None
+    note = dict(note)
+    note["relevance"] = _relevance(note.get("relevance"))
+    for key in ("strengths", "red_flags"):
+        if not isinstance(note.get(key), list):
+            note[key] = []
+    note["chars"] = chars
+    return note
+
+
+def merge_chunk_notes(notes: List[Dict[str, Any]], limit: int = 8) -> Dict[str, Any]:
+    """
+    Deterministic reduce used when the LLM reduce step fails: length-weighted mean
+    relevance as the match score, de-duplicated strengths and red flags.
+    Expects notes from normalize_chunk_note; notes without a relevance don't count
+    towards the score.
+    """
+    scored = [(max(1, n.get("chars", 1)), n["relevance"]) for n in notes if n.get("relevance") is not None]
+    score = sum(w * s for w, s in scored) / sum(w for w, _ in scored) if scored else 0.0
+    return {
+        "match_score": round(min(100.0, max(0.0, score)), 1),
+        "candidate_briefing": " ".join(str(n.get("summary", "")).strip() for n in notes if n.get("summary")),
+        "strengths": _dedupe([s for n in notes for s in n.get("strengths", [])], limit),
+        "red_flags": _dedupe([r for n in notes for r in n.get("red_flags", [])], limit),
+    }
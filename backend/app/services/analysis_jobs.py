@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.pdf import pdf_service
+from app.services.brain import brain_service
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("parse", "analyze", "embed", "store")
+
+
+class AnalysisJobManager:
+    """
+    Runs the resume analysis pipeline (parse -> analyze -> embed -> store)
+    off the event loop and tracks per-stage status for submit/poll clients.
+    Blocking stages run on the job thread pool; LLM stages use the async Ollama client.
+    """
+
+    def __init__(self, max_workers: int = 4, ttl_seconds: int = 3600, max_finished: int = 1000):
+        # Dedicated pool so long Docling / LLM calls don't starve the default executor
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self.ttl_seconds = ttl_seconds
+        # Finished jobs kept for pollers, oldest dropped first beyond this
+        self.max_finished = max_finished
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        # The loop only holds weak references to tasks; keep running jobs alive here
+        self._tasks: Set[asyncio.Task] = set()
+        # Jobs nobody will poll (e.g. from the synchronous endpoint), dropped when they finish
+        self._discard_on_finish: Set[str] = set()
+
+    def submit(self, filename: str, content: bytes, job_description: str,
+               store: Callable[[list, str, str], None], force: bool = False) -> Dict[str, Any]:
+        """Registers a job and schedules it on the running loop. Returns immediately."""
+        self._evict_expired()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "created_at": time.time(),
+            "finished_at": None,
+            "stages": {name: {"status": "pending", "duration_ms": None} for name in STAGES},
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        self._subscribers[job_id] = []
+        self._done[job_id] = asyncio.Event()
+
+        task = asyncio.create_task(self._run(job, content, job_description, store, force))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return self.snapshot(job_id)
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+        return {**job, "stages": {k: dict(v) for k, v in job["stages"].items()}}
+
+    async def wait(self, job_id: str) -> Dict[str, Any]:
+        """Blocks (asynchronously) until the job has finished."""
+        await self._done[job_id].wait()
+        return self.snapshot(job_id)
+
+    def discard(self, job_id: str):
+        """Forgets a job once its result has been read; a running job is dropped when it finishes."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        if job["finished_at"] is None:
+            self._discard_on_finish.add(job_id)
+        else:
+            self._forget(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yields a snapshot on every state change until the job finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            current = self.snapshot(job_id)
+            yield current
+            while current["status"] not in ("completed", "failed"):
+                current = await queue.get()
+                yield current
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers and queue in subscribers:
+                subscribers.remove(queue)
+
+    async def _run(self, job: Dict[str, Any], content: bytes, job_description: str,
+                   store: Callable[[list, str, str], None], force: bool):
+        job["status"] = "running"
+        self._publish(job)
+        try:
+            parsed = await self._stage(job, "parse", pdf_service.parse, content)
+            markdown_text = parsed["markdown"]
+            analysis = await self._stage(job, "analyze", brain_service.analyze_resume_async, markdown_text, job_description, force)
+            vector = await self._stage(job, "embed", brain_service.embed_text_async, markdown_text)
+            await self._stage(job, "store", store, vector, markdown_text, analysis["candidate_briefing"])
+
+            job["result"] = {
+                "filename": job["filename"],
+                "markdown": markdown_text,
+                "parse_tier": parsed["tier"],
+                "analysis_cache_key": brain_service.analysis_cache_key(markdown_text, job_description),
+                "analysis": analysis,
+            }
+            job["status"] = "completed"
+        except Exception as e:
+            logger.error(f"Analysis job {job['job_id']} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = time.time()
+            self._publish(job)
+            self._done[job["job_id"]].set()
+            if job["job_id"] in self._discard_on_finish:
+                self._forget(job["job_id"])
+
+    async def _stage(self, job: Dict[str, Any], name: str, fn: Callable, *args):
+        stage = job["stages"][name]
+        stage["status"] = "running"
+        self._publish(job)
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await fn(*args)
+            else:
+                result = await loop.run_in_executor(self.executor, fn, *args)
+        except Exception:
+            stage["status"] = "failed"
+            raise
+        finally:
+            stage["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        stage["status"] = "completed"
+        self._publish(job)
+        return result
+
+    def _publish(self, job: Dict[str, Any]):
+        snapshot = self.snapshot(job["job_id"])
+        for queue in self._subscribers.get(job["job_id"], []):
+            queue.put_nowait(snapshot)
+
+    def _evict_expired(self):
+        now = time.time()
+        finished = sorted(
+            (job["finished_at"], job_id) for job_id, job in self.jobs.items() if job["finished_at"]
+        )
+        overflow = max(0, len(finished) - self.max_finished)
+        for index, (finished_at, job_id) in enumerate(finished):
+            if index < overflow or now - finished_at > self.ttl_seconds:
+                self._forget(job_id)
+
+    def _forget(self, job_id: str):
+        self.jobs.pop(job_id, None)
+        self._subscribers.pop(job_id, None)
+        self._done.pop(job_id, None)
+        self._discard_on_finish.discard(job_id)
+
+
+analysis_jobs = AnalysisJobManager(
+    max_workers=settings.ANALYSIS_JOB_WORKERS,
+    ttl_seconds=settings.ANALYSIS_JOB_TTL_SECONDS,
+    max_finished=settings.ANALYSIS_JOB_MAX_FINISHED,
+)
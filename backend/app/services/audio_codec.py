@@ -0,0 +1,223 @@
+import logging
+import math
+import struct
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.services.voice import voice_service
+
+try:
+    import opuslib
+except Exception:
+    # ImportError, or opuslib's own error when the libopus shared library is missing
+    opuslib = None
+
+logger = logging.getLogger(__name__)
+
+CODECS = ("pcm16", "opus")
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_FRAME_MS = 20
+# Largest Opus packet duration (120 ms) at 48 kHz, per channel
+_OPUS_MAX_FRAME = 5760
+
+
+def downmix(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Interleaved multi-channel samples to mono by averaging channels."""
+    if channels <= 1:
+        return samples
+    usable = len(samples) - len(samples) % channels
+    return samples[:usable].reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+
+def float32_to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Little-endian signed 16-bit PCM to float32 in [-1, 1)."""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1) -> bytes:
+    """
+    RIFF/WAVE header for PCM16 audio of unknown length, so a WAV can be streamed
+    as it is synthesized. Size fields are set to the maximum, which players
+    treat as "read until the end of the stream".
+    """
+    block_align = channels * 2
+    return b"".join([
+        b"RIFF", struct.pack("<I", 0xFFFFFFFF), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16),
+        b"data", struct.pack("<I", 0xFFFFFFFF),
+    ])
+
+
+class Resampler:
+    """
+    Streaming band-limited resampler (Hann-windowed sinc interpolation).
+    Each output sample is a dot product over 2*taps neighbouring input samples,
+    computed for a whole chunk at once; state carries across chunks so
+    boundaries are seamless. When downsampling, the kernel is widened to
+    low-pass at the new Nyquist frequency. Kernels depend only on the output
+    sample's phase (n * src mod dst), so they are precomputed once per phase.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, taps: int = 16):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.cutoff = min(1.0, dst_rate / src_rate)
+        self.taps = int(np.ceil(taps / self.cutoff))
+        self.offsets = np.arange(-self.taps + 1, self.taps + 1)
+        # Output n sits at input position n * src / dst; its phase is n * src mod dst
+        self._phase_step = dst_rate // math.gcd(src_rate, dst_rate)
+        self._src_step = src_rate // math.gcd(src_rate, dst_rate)
+        fractions = (np.arange(self._phase_step) * self._src_step % self._phase_step) / self._phase_step
+        distance = fractions[:, None] - self.offsets[None, :]
+        window = 0.5 * (1 + np.cos(np.pi * np.clip(distance / self.taps, -1, 1)))
+        self._kernels = (self.cutoff * np.sinc(self.cutoff * distance) * window).astype(np.float32)
+
+        self._buffer = np.zeros(self.taps, dtype=np.float32)  # zero history before the stream
+        self._buffer_start = -self.taps  # absolute input index of _buffer[0]
+        self._produced = 0  # output samples emitted so far
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.src_rate == self.dst_rate:
+            return samples
+        self._buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+        return self._emit(self._buffer_start + len(self._buffer) - 1 - self.taps)
+
+    def flush(self) -> np.ndarray:
+        if self.src_rate == self.dst_rate:
+            return np.zeros(0, dtype=np.float32)
+        end = self._buffer_start + len(self._buffer)
+        self._buffer = np.concatenate([self._buffer, np.zeros(self.taps + 1, dtype=np.float32)])
+        return self._emit(end - 1)
+
+    def _emit(self, last_position: float) -> np.ndarray:
+        step = self.src_rate / self.dst_rate
+        count = int(np.floor(last_position / step)) - self._produced + 1
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+
+        n = self._produced + np.arange(count, dtype=np.int64)
+        base = n * self._src_step // self._phase_step
+        index = (base - self._buffer_start)[:, None] + self.offsets[None, :]
+        kernels = self._kernels[n % self._phase_step]
+        output = np.einsum("ij,ij->i", self._buffer[index], kernels)
+
+        self._produced += count
+        # Keep only the history the next chunk's kernels can reach
+        keep_from = int(np.floor(self._produced * step)) - self.taps
+        drop = max(0, keep_from - self._buffer_start)
+        self._buffer = self._buffer[drop:]
+        self._buffer_start += drop
+        return output
+
+
+class AudioDecoder:
+    """
+    Client audio (PCM16 or Opus packets, any rate / channel count) to 16 kHz mono float32.
+    PCM16 frames need not end on a sample (or multi-channel sample group) boundary:
+    the partial tail is carried into the next frame so channels stay aligned.
+    """
+
+    def __init__(self, codec: str, sample_rate: int, channels: int, target_rate: int = 16000):
+        self.codec = codec
+        self.channels = channels
+        self.target_rate = target_rate
+        if codec == "opus":
+            # libopus decodes straight to the target rate; no resampling needed
+            self._opus = opuslib.Decoder(target_rate, channels)
+            self._frame = _OPUS_MAX_FRAME * target_rate // 48000
+            self._resampler = None
+        else:
+            self._opus = None
+            self._resampler = Resampler(sample_rate, target_rate)
+        self._leftover = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """Raises ValueError for a frame that cannot be decoded; the stream stays usable."""
+        if self._opus is not None:
+            try:
+                pcm = self._opus.decode(data, self._frame)
+            except Exception as e:
+                raise ValueError(f"Invalid Opus packet: {e}") from e
+            return downmix(pcm16_to_float32(pcm), self.channels)
+
+        data = self._leftover + data
+        usable = len(data) - len(data) % (2 * self.channels)
+        self._leftover = data[usable:]
+        return self._resampler.process(downmix(pcm16_to_float32(data[:usable]), self.channels))
+
+
+class AudioEncoder:
+    """
+    Server audio (float32 mono at the TTS rate) to the negotiated output format.
+    - wav: one WAV file per message (the original behaviour).
+    - pcm16: raw little-endian samples at `sample_rate`.
+    - opus: 20 ms Opus packets, each prefixed with its length as uint16 LE.
+    """
+
+    def __init__(self, codec: str = "wav", sample_rate: Optional[int] = None, bitrate: int = 24000):
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self._opus = None
+        if codec == "opus":
+            self._opus = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+            self._opus.bitrate = bitrate
+
+    def encode(self, samples: np.ndarray, sample_rate: int) -> bytes:
+        if self.codec == "wav":
+            return voice_service.encode_wav(samples, sample_rate)
+        if self.sample_rate and self.sample_rate != sample_rate:
+            resampler = Resampler(sample_rate, self.sample_rate)
+            samples = np.concatenate([resampler.process(samples), resampler.flush()])
+        if self._opus is None:
+            return float32_to_pcm16(samples)
+
+        frame = self.sample_rate * OPUS_FRAME_MS // 1000
+        padded = np.pad(samples, (0, -len(samples) % frame))
+        packets = []
+        for start in range(0, len(padded), frame):
+            packet = self._opus.encode(float32_to_pcm16(padded[start:start + frame]), frame)
+            packets.append(struct.pack("<H", len(packet)) + packet)
+        return b"".join(packets)
+
+
+def negotiate(params: Dict[str, str], tts_rate: int = 24000):
+    """
+    Builds the socket's decoder / encoder from query parameters:
+    codec=pcm16|opus, sample_rate, channels (client audio) and
+    output=wav|pcm16|opus, output_sample_rate (server audio).
+    Without libopus, Opus input is rejected and Opus output falls back to PCM16.
+    Returns (decoder, encoder, description for the client).
+    """
+    codec = params.get("codec", "pcm16")
+    if codec not in CODECS or (codec == "opus" and opuslib is None):
+        raise ValueError(f"Unsupported codec: {codec}")
+    output = params.get("output", "wav")
+    if output not in ("wav",) + CODECS:
+        raise ValueError(f"Unsupported output codec: {output}")
+    if output == "opus" and opuslib is None:
+        logger.warning("Opus output requested but libopus is unavailable; using PCM16")
+        output = "pcm16"
+
+    sample_rate = int(params.get("sample_rate", 16000))
+    channels = int(params.get("channels", 1))
+    if not (8000 <= sample_rate <= 192000) or not (1 <= channels <= 8):
+        raise ValueError("Unsupported sample_rate / channels")
+
+    output_rate: Optional[int] = None
+    if output != "wav":
+        output_rate = int(params.get("output_sample_rate", tts_rate))
+        if output == "opus" and output_rate not in OPUS_SAMPLE_RATES:
+            output_rate = 24000
+        if not (8000 <= output_rate <= 48000):
+            raise ValueError("Unsupported output_sample_rate")
+
+    description: Dict[str, Any] = {
+        "input": {"codec": codec, "sample_rate": sample_rate if codec == "pcm16" else 16000, "channels": channels},
+        "output": {"codec": output, "sample_rate": output_rate or tts_rate, "channels": 1},
+    }
+    return AudioDecoder(codec, sample_rate, channels), AudioEncoder(output, output_rate), description
@@ -1,36 +1,185 @@
 import json
+import time
+import asyncio
+import hashlib
 import logging
-from ollama import Client
+import unicodedata
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+from ollama import Client, AsyncClient
 
 import os
 
+from app.core.config import settings
+from app.core.cache import LRUCache, DiskCache, RedisCache
+from app.services.embed_batcher import EmbeddingBatcher
+from app.services.embedders import build_embedder
+from app.services.llm_scheduler import llm_scheduler
+from app.services.model_residency import model_residency
+from app.services.analysis_chunks import chunk_resume, merge_chunk_notes, normalize_chunk_note
+from app.services.cancellation import cancellation_stats
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever the analysis prompt changes so cached results are invalidated
+ANALYSIS_PROMPT_VERSION = "1"
+ANALYSIS_TEMPERATURE = 0.2
+# Keys the store stage and API clients rely on; output missing any is not cached
+ANALYSIS_REQUIRED_KEYS = ("match_score", "candidate_briefing", "strengths", "red_flags")
+
+ARIA_FALLBACK_REPLY = "I'm having a little trouble thinking right now, but I'd love to continue our conversation in a moment!"
+
 class BrainService:
     def __init__(self):
         host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
         self.client = Client(host=host)
+        # Shared keep-alive connection pool for the async handlers
+        self.async_client = AsyncClient(
+            host=host,
+            timeout=httpx.Timeout(settings.OLLAMA_ANALYSIS_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+        )
         self.analysis_model = "phi3.5"
         self.chat_model = "llama3.2"
         self.embed_model = "nomic-embed-text"
+        self.models = {"chat": self.chat_model, "analysis": self.analysis_model, "embed": self.embed_model}
+        for role, model in self.models.items():
+            model_residency.register(role, model)
+        # Interview summaries reuse the (pinned) chat model so they never force a swap
+        self.models["summary"] = self.chat_model
+
+        # Chat and analysis share Ollama's generation slots through the priority
+        # scheduler (live turns first); embeddings keep their own small limit
+        self.priorities = {"chat": "interactive", "analysis": "batch", "summary": "batch"}
+        self.embed_limit = asyncio.Semaphore(settings.OLLAMA_EMBED_CONCURRENCY)
+        self.timeouts = {
+            "chat": settings.OLLAMA_CHAT_TIMEOUT_SECONDS,
+            "analysis": settings.OLLAMA_ANALYSIS_TIMEOUT_SECONDS,
+            "embed": settings.OLLAMA_EMBED_TIMEOUT_SECONDS,
+            "summary": settings.OLLAMA_ANALYSIS_TIMEOUT_SECONDS,
+        }
+        self.embedder = build_embedder(self.client, self.embed_model)
+
+        # Embedding memoization: in-process LRU plus an optional shared second tier
+        self.embed_cache = LRUCache(max_entries=settings.EMBED_CACHE_MEMORY_ENTRIES)
+        if settings.EMBED_CACHE_BACKEND == "redis":
+            self.embed_cache_l2 = RedisCache(
+                f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/1",
+                prefix="embed",
+                ttl_seconds=settings.EMBED_CACHE_TTL_SECONDS or None,
+            )
+        elif settings.EMBED_CACHE_BACKEND == "disk":
+            self.embed_cache_l2 = DiskCache(settings.EMBED_CACHE_DIR, max_bytes=settings.EMBED_CACHE_DISK_MB * 1024 * 1024)
+        else:
+            self.embed_cache_l2 = None
+
+        self.embed_batcher = None
+        if settings.EMBED_BATCH_WAIT_MS > 0:
+            self.embed_batcher = EmbeddingBatcher(
+                self._embed_uncached,
+                max_batch_size=settings.EMBED_BATCH_SIZE,
+                max_wait_ms=settings.EMBED_BATCH_WAIT_MS,
+            )
+
+        # Persistent analyze_resume results, keyed on everything that affects the output
+        self.analysis_cache = DiskCache(settings.ANALYSIS_CACHE_DIR, max_bytes=settings.ANALYSIS_CACHE_DISK_MB * 1024 * 1024)
+        self.analysis_cache_ttl = settings.ANALYSIS_CACHE_TTL_SECONDS
+
+        # Map-reduce analysis for long resumes (async path): chunk map calls run side by side
+        self.chunk_threshold = settings.ANALYSIS_CHUNK_THRESHOLD_CHARS
+        self.chunk_max_chars = settings.ANALYSIS_CHUNK_MAX_CHARS
+        self.max_chunks = settings.ANALYSIS_MAX_CHUNKS
+
+    def embed_cache_key(self, text: str) -> str:
+        # Whitespace/unicode-normalized so trivially different copies share an entry
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha256(f"{self.embedder.name}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def _cached_embedding(self, key: str) -> Optional[list]:
+        vector = self.embed_cache.get(key)
+        if vector is None and self.embed_cache_l2 is not None:
+            vector = self.embed_cache_l2.get(key)
+            if vector is not None:
+                self.embed_cache.set(key, vector)
+        return vector
+
+    def _store_embedding(self, key: str, vector: list):
+        self.embed_cache.set(key, vector)
+        if self.embed_cache_l2 is not None:
+            self.embed_cache_l2.set(key, vector)
 
     def embed_text(self, text: str) -> list:
         """
-        Generates embeddings using nomic-embed-text via Ollama.
+        Generates embeddings with the configured backend (Ollama or in-process ONNX).
+        Identical (model, normalized text) pairs are served from the embedding cache;
+        concurrent misses are coalesced into one batched backend call.
         """
-        try:
-            response = self.client.embeddings(model=self.embed_model, prompt=text)
-            return response['embedding']
-        except Exception as e:
-            logger.error(f"Error generating embeddings: {e}")
-            return [0.0] * 768 # Default for nomic
+        key = self.embed_cache_key(text)
+        vector = self._cached_embedding(key)
+        if vector is not None:
+            return vector
+
+        if self.embed_batcher is not None:
+            return self.embed_batcher.submit(text).result()
+        return self._embed_uncached([text])[0]
 
-    def analyze_resume(self, text: str, job_description: str) -> dict:
+    def embed_many(self, texts: List[str]) -> List[list]:
         """
-        Uses Phi-3.5 to analyze the resume against a job description.
-        Forces strict JSON output.
+        Embeds a list of texts with as few backend calls as possible.
+        Cache hits are skipped and duplicate texts are embedded once.
+        """
+        keys = [self.embed_cache_key(text) for text in texts]
+        vectors = [self._cached_embedding(key) for key in keys]
+
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if not missing:
+            return vectors
+
+        fresh = dict(zip(missing.keys(), self._embed_uncached(list(missing.values()))))
+        return [vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)]
+
+    def _embed_uncached(self, texts: List[str]) -> List[list]:
+        """
+        Calls the embedding backend in chunks of EMBED_BATCH_SIZE and caches the results.
+        Failed chunks fall back to zero vectors, which are never cached.
         """
-        prompt = f"""
+        vectors: List[list] = []
+        batch_size = max(1, settings.EMBED_BATCH_SIZE)
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            try:
+                chunk_vectors = self.embedder.embed(chunk)
+            except Exception as e:
+                logger.error(f"Error generating embeddings: {e}")
+                vectors.extend([0.0] * settings.EMBED_DIM for _ in chunk)
+                continue
+
+            for text, vector in zip(chunk, chunk_vectors):
+                self._store_embedding(self.embed_cache_key(text), vector)
+            vectors.extend(chunk_vectors)
+        return vectors
+
+    def embed_cache_stats(self) -> dict:
+        return {
+            "memory": self.embed_cache.stats(),
+            "l2": self.embed_cache_l2.stats() if self.embed_cache_l2 is not None else None,
+        }
+
+    def analysis_cache_stats(self) -> dict:
+        return self.analysis_cache.stats()
+
+    def embed_batch_stats(self) -> Optional[dict]:
+        return self.embed_batcher.stats() if self.embed_batcher is not None else None
+
+    def _analysis_prompt(self, text: str, job_description: str) -> str:
+        return f"""
         Analyze the following resume against the job description.
         
         Job Description:
@@ -47,44 +196,386 @@ class BrainService:
         
         Return ONLY the JSON.
         """
-        
-        try:
-            response = self.client.generate(
-                model=self.analysis_model,
-                prompt=prompt,
-                format="json",
-                options={"temperature": 0.2}
-            )
-            return json.loads(response['response'])
-        except Exception as e:
-            logger.error(f"Error in analyze_resume: {e}")
-            return {
-                "match_score": 0,
-                "candidate_briefing": "Analysis failed.",
-                "strengths": [],
-                "red_flags": ["System error during processing"]
-            }
 
-    def chat_with_aria(self, history: list, user_input: str) -> str:
+    def _chunk_prompt(self, chunk: str, job_description: str, index: int, total: int) -> str:
+        return f"""
+        Evaluate one part ({index} of {total}) of a resume against the job description.
+        Judge only what this part shows; other parts are evaluated separately.
+
+        Job Description:
+        {job_description}
+
+        Resume part (Markdown):
+        {chunk}
+
+        Output a strictly formatted JSON object with these keys:
+        - relevance: (float between 0 and 100, how well this part supports the match)
+        - summary: (one or two sentences on what this part shows)
+        - strengths: (list of short strings)
+        - red_flags: (list of short strings)
+
+        Return ONLY the JSON.
         """
-        Uses Llama-3.2 for the 'Aria' recruiter persona.
+
+    def _reduce_prompt(self, notes: List[dict], job_description: str) -> str:
+        parts = "\n".join(
+            f"Part {i}: relevance {n.get('relevance')}; {n.get('summary', '')} "
+            f"Strengths: {'; '.join(map(str, n.get('strengths', [])))}. "
+            f"Red flags: {'; '.join(map(str, n.get('red_flags', [])))}."
+            for i, n in enumerate(notes, 1)
+        )
+        return f"""
+        Combine these notes on the parts of one resume into a single assessment.
+
+        Job Description:
+        {job_description}
+
+        Notes per resume part:
+        {parts}
+
+        Output a strictly formatted JSON object with these keys:
+        - match_score: (float between 0 and 100)
+        - candidate_briefing: (a persuasive paragraph for the employer about this candidate)
+        - strengths: (list of strings)
+        - red_flags: (list of strings)
+
+        Return ONLY the JSON.
+        """
+
+    def _use_chunks(self, text: str) -> bool:
+        return 0 < self.chunk_threshold < len(text)
+
+    def _chunk_notes(self, raws: List[Optional[str]], chunks: List[str]) -> List[dict]:
         """
+        Parses the map outputs, skipping chunks whose call failed (None), whose JSON is
+        malformed or not an object; field types are coerced by normalize_chunk_note.
+        """
+        notes = []
+        for raw, chunk in zip(raws, chunks):
+            if raw is None:
+                continue
+            try:
+                note = normalize_chunk_note(json.loads(raw), len(chunk))
+            except ValueError as e:
+                logger.warning(f"Skipping resume chunk with invalid analysis JSON: {e}")
+                continue
+            if note is None:
+                logger.warning("Skipping resume chunk whose analysis is not a JSON object")
+                continue
+            notes.append(note)
+        if not notes:
+            raise ValueError("No resume chunk produced a valid analysis")
+        return notes
+
+    def _reduced(self, raw: Optional[str], notes: List[dict]) -> dict:
+        """Parses the reduce output, falling back to a deterministic merge of the notes."""
+        if raw is None:
+            return merge_chunk_notes(notes)
+        try:
+            analysis = json.loads(raw)
+        except ValueError as e:
+            logger.warning(f"Analysis reduce step returned invalid JSON, merging notes instead: {e}")
+            return merge_chunk_notes(notes)
+        if not isinstance(analysis, dict):
+            logger.warning("Analysis reduce step did not return a JSON object, merging notes instead")
+            return merge_chunk_notes(notes)
+        missing = [field for field in ANALYSIS_REQUIRED_KEYS if field not in analysis]
+        if missing:
+            fallback = merge_chunk_notes(notes)
+            for field in missing:
+                analysis[field] = fallback[field]
+        return analysis
+
+    def _valid_analysis(self, analysis) -> bool:
+        return isinstance(analysis, dict) and all(k in analysis for k in ANALYSIS_REQUIRED_KEYS)
+
+    def _analysis_failed(self) -> dict:
+        return {
+            "match_score": 0,
+            "candidate_briefing": "Analysis failed.",
+            "strengths": [],
+            "red_flags": ["System error during processing"]
+        }
+
+    def _aria_messages(self, history: list, user_input: str) -> list:
         system_prompt = "You are Aria, a friendly and encouraging recruiter. Keep responses under 2 sentences. Focus on the candidate's potential."
         
         messages = [{"role": "system", "content": system_prompt}]
         for msg in history:
             messages.append(msg)
         messages.append({"role": "user", "content": user_input})
-        
+        return messages
+
+    def _summary_prompt(self, summary: str, turns: List[dict], max_words: int) -> str:
+        transcript = "\n".join(f"{t['role'].capitalize()}: {t['content']}" for t in turns)
+        return f"""
+        You maintain running notes on a job interview between Aria (assistant) and a candidate (user).
+        Update the notes with the new transcript. Keep facts about the candidate's experience,
+        skills, answers and any open questions. Write at most {max_words} words of plain prose.
+
+        Current notes:
+        {summary or "(none)"}
+
+        New transcript:
+        {transcript}
+        """
+
+    def analysis_cache_key(self, text: str, job_description: str, chunked: Optional[bool] = None) -> str:
+        parts = [
+            hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            hashlib.sha256(job_description.encode("utf-8")).hexdigest(),
+            self.analysis_model,
+            ANALYSIS_PROMPT_VERSION,
+            str(ANALYSIS_TEMPERATURE),
+        ]
+        if (self._use_chunks(text) if chunked is None else chunked):
+            parts.append(f"chunked:{self.chunk_max_chars}:{self.max_chunks}")
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def _cached_analysis(self, key: str) -> Optional[dict]:
+        entry = self.analysis_cache.get(key)
+        if entry is None:
+            return None
+        expired = self.analysis_cache_ttl and time.time() - entry["cached_at"] > self.analysis_cache_ttl
+        if expired or not self._valid_analysis(entry["analysis"]):
+            self.analysis_cache.delete(key)
+            return None
+        return entry["analysis"]
+
+    def _store_analysis(self, key: str, analysis: dict):
+        self.analysis_cache.set(key, {"cached_at": time.time(), "analysis": analysis})
+
+    def invalidate_analysis(self, key: Optional[str] = None):
+        """Drops one cached analysis by key, or all of them."""
+        if key is None:
+            self.analysis_cache.clear()
+        else:
+            self.analysis_cache.delete(key)
+
+    def analyze_resume(self, text: str, job_description: str, force: bool = False) -> dict:
+        """
+        Uses Phi-3.5 to analyze the resume against a job description.
+        Forces strict JSON output. Results are cached; force=True re-scores and overwrites.
+        Always a single call: map-reduce for long resumes is only on analyze_resume_async,
+        where the chunk calls go through the LLM scheduler.
+        """
+        key = self.analysis_cache_key(text, job_description, chunked=False)
+        if not force:
+            cached = self._cached_analysis(key)
+            if cached is not None:
+                return cached
+
+        try:
+            analysis = json.loads(self._generate_analysis(self._analysis_prompt(text, job_description)))
+        except Exception as e:
+            logger.error(f"Error in analyze_resume: {e}")
+            return self._analysis_failed()
+
+        if not self._valid_analysis(analysis):
+            logger.error(f"Analysis output is missing required fields: {str(analysis)[:200]}")
+            return self._analysis_failed()
+        self._store_analysis(key, analysis)
+        return analysis
+
+    def _generate_analysis(self, prompt: str) -> str:
+        response = self.client.generate(
+            model=self.analysis_model,
+            prompt=prompt,
+            format="json",
+            options={"temperature": ANALYSIS_TEMPERATURE},
+            keep_alive=model_residency.keep_alive_for("analysis"),
+        )
+        model_residency.observe(self.analysis_model, response)
+        return response['response']
+
+    def chat_with_aria(self, history: list, user_input: str) -> str:
+        """
+        Uses Llama-3.2 for the 'Aria' recruiter persona.
+        """
+        model_residency.note_chat_turn()
         try:
             response = self.client.chat(
                 model=self.chat_model,
-                messages=messages,
-                options={"temperature": 0.7}
+                messages=self._aria_messages(history, user_input),
+                options={"temperature": 0.7},
+                keep_alive=model_residency.keep_alive_for("chat"),
             )
+            model_residency.observe(self.chat_model, response)
             return response['message']['content']
         except Exception as e:
             logger.error(f"Error in chat_with_aria: {e}")
-            return "I'm having a little trouble thinking right now, but I'd love to continue our conversation in a moment!"
+            return ARIA_FALLBACK_REPLY
+
+    # --- Async path: pooled keep-alive client, scheduled by priority class ---
+
+    async def _limited(self, role: str, call):
+        """
+        Runs an Ollama call once the scheduler grants the role's priority class a slot.
+        The timeout covers the call itself, not the queue wait.
+        Cancelling the awaiting task closes the HTTP request, which stops generation;
+        the time the model already spent on it is counted as wasted.
+        """
+        model = self.models[role]
+        started = None
+        try:
+            async with llm_scheduler.slot(self.priorities[role], model):
+                started = time.perf_counter()
+                response = await asyncio.wait_for(call(), timeout=self.timeouts[role])
+        except asyncio.CancelledError:
+            wasted_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+            cancellation_stats.record("llm", cancelled=1, wasted_ms=wasted_ms)
+            raise
+        model_residency.observe(model, response)
+        return response
+
+    async def analyze_resume_async(self, text: str, job_description: str, force: bool = False) -> dict:
+        key = self.analysis_cache_key(text, job_description)
+        if not force:
+            # The disk tier does file I/O; keep it off the event loop
+            cached = await asyncio.to_thread(self._cached_analysis, key)
+            if cached is not None:
+                return cached
+
+        try:
+            if self._use_chunks(text):
+                analysis = await self._analyze_chunked_async(text, job_description)
+            else:
+                analysis = json.loads(await self._generate_analysis_async(self._analysis_prompt(text, job_description)))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in analyze_resume_async: {e!r}")
+            return self._analysis_failed()
+
+        if not self._valid_analysis(analysis):
+            logger.error(f"Analysis output is missing required fields: {str(analysis)[:200]}")
+            return self._analysis_failed()
+        await asyncio.to_thread(self._store_analysis, key, analysis)
+        return analysis
+
+    async def _generate_analysis_async(self, prompt: str) -> str:
+        response = await self._limited("analysis", lambda: self.async_client.generate(
+            model=self.analysis_model,
+            prompt=prompt,
+            format="json",
+            options={"temperature": ANALYSIS_TEMPERATURE},
+            keep_alive=model_residency.keep_alive_for("analysis"),
+        ))
+        return response['response']
+
+    async def _analyze_chunked_async(self, text: str, job_description: str) -> dict:
+        """Async map-reduce; the scheduler's batch limit caps how many chunks run at once."""
+        chunks = chunk_resume(text, self.chunk_max_chars, self.max_chunks)
+        results = await asyncio.gather(*(
+            self._generate_analysis_async(self._chunk_prompt(c, job_description, i, len(chunks)))
+            for i, c in enumerate(chunks, 1)
+        ), return_exceptions=True)
+        raws = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Skipping resume chunk whose analysis call failed: {result!r}")
+                raws.append(None)
+            else:
+                raws.append(result)
+        notes = self._chunk_notes(raws, chunks)
+        try:
+            reduced = await self._generate_analysis_async(self._reduce_prompt(notes, job_description))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Analysis reduce step failed, merging notes instead: {e!r}")
+            reduced = None
+        return self._reduced(reduced, notes)
+
+    async def chat_with_aria_async(self, history: list, user_input: str) -> str:
+        model_residency.note_chat_turn()
+        try:
+            response = await self._limited("chat", lambda: self.async_client.chat(
+                model=self.chat_model,
+                messages=self._aria_messages(history, user_input),
+                options={"temperature": 0.7},
+                keep_alive=model_residency.keep_alive_for("chat"),
+            ))
+            return response['message']['content']
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in chat_with_aria_async: {e!r}")
+            return ARIA_FALLBACK_REPLY
+
+    async def summarize_conversation_async(self, summary: str, turns: List[dict], max_words: int = 200) -> Optional[str]:
+        """
+        Folds `turns` into the running interview `summary`.
+        Returns None on failure so the caller can keep the turns verbatim.
+        """
+        try:
+            response = await self._limited("summary", lambda: self.async_client.generate(
+                model=self.chat_model,
+                prompt=self._summary_prompt(summary, turns, max_words),
+                options={"temperature": 0.2},
+                keep_alive=model_residency.keep_alive_for("chat"),
+            ))
+            return response['response'].strip() or None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in summarize_conversation_async: {e!r}")
+            return None
+
+    async def stream_chat_with_aria(self, history: list, user_input: str) -> AsyncIterator[str]:
+        """
+        Yields Aria's reply token by token straight from a streaming chat call.
+        Falls back to the canned reply if the model fails before the first token.
+        Closing the generator (e.g. the client disconnected) closes the stream,
+        which stops generation.
+        """
+        emitted = False
+        started = None
+        model_residency.note_chat_turn()
+        try:
+            async with llm_scheduler.slot(self.priorities["chat"], self.chat_model):
+                started = time.perf_counter()
+                async with asyncio.timeout(self.timeouts["chat"]):
+                    stream = await self.async_client.chat(
+                        model=self.chat_model,
+                        messages=self._aria_messages(history, user_input),
+                        options={"temperature": 0.7},
+                        stream=True,
+                        keep_alive=model_residency.keep_alive_for("chat"),
+                    )
+                    async for chunk in stream:
+                        if chunk.get('done'):
+                            # load_duration is only reported on the final chunk
+                            model_residency.observe(self.chat_model, chunk)
+                        token = chunk['message']['content']
+                        if token:
+                            emitted = True
+                            yield token
+        except (asyncio.CancelledError, GeneratorExit):
+            wasted_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+            cancellation_stats.record("llm", cancelled=1, wasted_ms=wasted_ms)
+            raise
+        except Exception as e:
+            logger.error(f"Error in stream_chat_with_aria: {e!r}")
+            if not emitted:
+                yield ARIA_FALLBACK_REPLY
+
+    async def embed_text_async(self, text: str) -> list:
+        key = self.embed_cache_key(text)
+        vector = self.embed_cache.get(key)
+        if vector is None and self.embed_cache_l2 is not None:
+            # The L2 tier is disk or Redis I/O; keep it off the event loop
+            vector = await asyncio.to_thread(self._cached_embedding, key)
+        if vector is not None:
+            return vector
+
+        if self.embed_batcher is not None:
+            # The batcher thread already serializes backend calls; waiters just coalesce
+            future = asyncio.wrap_future(self.embed_batcher.submit(text))
+            return await asyncio.wait_for(future, timeout=self.timeouts["embed"])
+
+        async with self.embed_limit:
+            result = await asyncio.wait_for(asyncio.to_thread(self._embed_uncached, [text]), timeout=self.timeouts["embed"])
+        return result[0]
 
 brain_service = BrainService()
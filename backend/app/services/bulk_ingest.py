@@ -0,0 +1,228 @@
+import asyncio
+import io
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Tuple, Union
+
+from app.core.config import settings
+from app.services.pdf import pdf_service
+from app.services.brain import brain_service
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def iter_zip_pdfs(archive_bytes: bytes) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+    """
+    Lazily yields (filename, bytes) for every PDF inside a ZIP archive.
+    Members are decompressed one at a time as the pipeline pulls them.
+    A member that cannot be read (bad CRC, truncated, encrypted) is yielded with
+    the exception in place of its bytes, so the rest of the archive still goes through.
+    """
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+                continue
+            try:
+                content = archive.read(info)
+            except Exception as e:
+                content = e
+            yield os.path.basename(name), content
+
+
+class BulkIngestPipeline:
+    """
+    Streams many resumes through parse -> analyze -> embed -> store.
+    Each stage has its own worker count and a bounded input queue, so a slow
+    stage applies backpressure instead of buffering the whole upload.
+    Store writes are batched into a single LanceDB commit.
+    """
+
+    def __init__(self, parse_concurrency: int = 2, analyze_concurrency: int = 2,
+                 embed_concurrency: int = 4, batch_size: int = 32,
+                 flush_seconds: float = 2.0, queue_size: int = 8):
+        self.parse_concurrency = parse_concurrency
+        self.analyze_concurrency = analyze_concurrency
+        self.embed_concurrency = embed_concurrency
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue_size = queue_size
+        # Parse and store block; analyze and embed go through the async Ollama client
+        self.executor = ThreadPoolExecutor(
+            max_workers=parse_concurrency + 1,
+            thread_name_prefix="bulk-ingest",
+        )
+
+    async def run(self, sources: Iterator[Tuple[str, bytes]], job_description: str,
+                  store_many: Callable[[List[dict]], None], force: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields one result per file as soon as it is stored (or fails),
+        followed by a final summary event.
+        """
+        parse_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        analyze_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        embed_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        store_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        results_q: asyncio.Queue = asyncio.Queue()
+
+        async def parse(item):
+            parsed = await self._call(pdf_service.parse, item.pop("content"))
+            item["markdown"] = parsed["markdown"]
+            item["parse_tier"] = parsed["tier"]
+
+        async def analyze(item):
+            item["analysis"] = await brain_service.analyze_resume_async(item["markdown"], job_description, force)
+
+        async def embed(item):
+            item["vector"] = await brain_service.embed_text_async(item["markdown"])
+
+        tasks = [
+            asyncio.create_task(self._produce(sources, parse_q, results_q)),
+            asyncio.create_task(self._stage(parse_q, analyze_q, results_q, parse, self.parse_concurrency)),
+            asyncio.create_task(self._stage(analyze_q, embed_q, results_q, analyze, self.analyze_concurrency)),
+            asyncio.create_task(self._stage(embed_q, store_q, results_q, embed, self.embed_concurrency)),
+            asyncio.create_task(self._store(store_q, results_q, store_many)),
+        ]
+
+        start = time.perf_counter()
+        counts = {"completed": 0, "failed": 0}
+        try:
+            while True:
+                result = await results_q.get()
+                if result is _DONE:
+                    break
+                counts[result["status"]] += 1
+                yield result
+
+            elapsed = time.perf_counter() - start
+            total = counts["completed"] + counts["failed"]
+            yield {
+                "status": "summary",
+                "total": total,
+                **counts,
+                "elapsed_seconds": round(elapsed, 2),
+                "resumes_per_minute": round(counts["completed"] / elapsed * 60, 1) if elapsed else 0.0,
+            }
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def _produce(self, sources: Iterator[Tuple[str, Union[bytes, Exception]]], out_q: asyncio.Queue,
+                       results_q: asyncio.Queue):
+        index = 0
+        iterator = iter(sources)
+        cancelled = False
+        try:
+            while True:
+                # Decompressing the next member can be slow for large archives
+                try:
+                    entry = await asyncio.to_thread(next, iterator, None)
+                except Exception as e:
+                    # The source itself broke; nothing after this point can be read
+                    logger.error(f"Bulk ingest could not read further files: {e}")
+                    await results_q.put({"index": index, "filename": None, "status": "failed", "error": str(e)})
+                    break
+                if entry is None:
+                    break
+                filename, content = entry
+                if isinstance(content, Exception):
+                    logger.error(f"Bulk ingest could not read {filename}: {content}")
+                    await results_q.put({"index": index, "filename": filename, "status": "failed", "error": str(content)})
+                else:
+                    await out_q.put({"index": index, "filename": filename, "content": content})
+                index += 1
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Always end the stream, or every downstream stage waits forever
+            # (unless the whole pipeline is being torn down)
+            if not cancelled:
+                await out_q.put(_DONE)
+
+    async def _stage(self, in_q: asyncio.Queue, out_q: asyncio.Queue, results_q: asyncio.Queue,
+                     fn: Callable, concurrency: int):
+        async def worker():
+            while True:
+                item = await in_q.get()
+                if item is _DONE:
+                    # Let sibling workers see the sentinel too
+                    await in_q.put(_DONE)
+                    return
+                try:
+                    await fn(item)
+                except Exception as e:
+                    logger.error(f"Bulk ingest failed for {item['filename']}: {e}")
+                    await results_q.put({"index": item["index"], "filename": item["filename"],
+                                         "status": "failed", "error": str(e)})
+                    continue
+                await out_q.put(item)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        await out_q.put(_DONE)
+
+    async def _store(self, in_q: asyncio.Queue, results_q: asyncio.Queue,
+                     store_many: Callable[[List[dict]], None]):
+        batch: List[dict] = []
+        deadline = None
+        finished = False
+        loop = asyncio.get_running_loop()
+        while not finished:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(in_q.get(), timeout=timeout)
+                if item is _DONE:
+                    finished = True
+                else:
+                    if not batch:
+                        deadline = loop.time() + self.flush_seconds
+                    batch.append(item)
+            except asyncio.TimeoutError:
+                pass
+
+            # Flush on row count, on the age of the oldest buffered row, or at the end
+            if batch and (finished or len(batch) >= self.batch_size or loop.time() >= deadline):
+                await self._flush(batch, results_q, store_many)
+                batch = []
+                deadline = None
+
+        await results_q.put(_DONE)
+
+    async def _flush(self, batch: List[dict], results_q: asyncio.Queue,
+                     store_many: Callable[[List[dict]], None]):
+        rows = [
+            {"vector": item["vector"], "text": item["markdown"], "briefing": item["analysis"]["candidate_briefing"]}
+            for item in batch
+        ]
+        try:
+            await self._call(store_many, rows)
+            error = None
+        except Exception as e:
+            logger.error(f"Bulk ingest store batch of {len(rows)} failed: {e}")
+            error = str(e)
+
+        for item in batch:
+            if error:
+                result = {"index": item["index"], "filename": item["filename"], "status": "failed", "error": error}
+            else:
+                result = {"index": item["index"], "filename": item["filename"], "status": "completed",
+                          "parse_tier": item["parse_tier"], "analysis": item["analysis"]}
+            await results_q.put(result)
+
+
+bulk_ingest = BulkIngestPipeline(
+    parse_concurrency=settings.BULK_PARSE_CONCURRENCY,
+    analyze_concurrency=settings.BULK_ANALYZE_CONCURRENCY,
+    embed_concurrency=settings.BULK_EMBED_CONCURRENCY,
+    batch_size=settings.BULK_STORE_BATCH_SIZE,
+    flush_seconds=settings.BULK_STORE_FLUSH_SECONDS,
+)
@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Coroutine, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Work kinds tracked in the counters
+KINDS = ("llm", "tts", "stt", "cv")
+
+
+class WorkCancelled(Exception):
+    """Raised at a checkpoint when the client the work belongs to has gone."""
+
+
+class CancelToken:
+    """
+    Cooperative cancellation flag for everything started on behalf of one client.
+    Thread-safe, so pool workers and to_thread calls can check it between steps.
+    """
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+
+# Set for the lifetime of a connection; copied into tasks and to_thread calls it starts
+_current: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _current.get()
+
+
+class CancellationStats:
+    """Counters for work dropped or thrown away because its client disconnected."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.kinds = {kind: {"cancelled": 0, "wasted_ms": 0.0} for kind in KINDS}
+        self.connections: Dict[str, Dict[str, int]] = {}
+
+    def record(self, kind: str, cancelled: int = 0, wasted_ms: float = 0.0):
+        """
+        cancelled: units of work stopped before or while running.
+        wasted_ms: compute spent on work whose result nobody will receive.
+        """
+        with self._lock:
+            counters = self.kinds.setdefault(kind, {"cancelled": 0, "wasted_ms": 0.0})
+            counters["cancelled"] += cancelled
+            counters["wasted_ms"] += wasted_ms
+
+    def record_connection(self, name: str, cancelled_tasks: int):
+        with self._lock:
+            counters = self.connections.setdefault(name, {"closed": 0, "cancelled_tasks": 0})
+            counters["closed"] += 1
+            counters["cancelled_tasks"] += cancelled_tasks
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "work": {
+                    kind: {"cancelled": c["cancelled"], "wasted_ms": round(c["wasted_ms"], 1)}
+                    for kind, c in self.kinds.items()
+                },
+                "connections": {name: dict(c) for name, c in self.connections.items()},
+            }
+
+
+cancellation_stats = CancellationStats()
+
+
+def checkpoint(kind: str):
+    """Raises WorkCancelled if the current connection has gone."""
+    token = _current.get()
+    if token is not None and token.cancelled:
+        cancellation_stats.record(kind, cancelled=1)
+        raise WorkCancelled(f"{kind} work cancelled: {token.owner} disconnected")
+
+
+def cancellable(kind: str):
+    """
+    Decorator for blocking inference calls: checks the connection before running and
+    counts the run time as wasted if the client disconnected while it ran.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            checkpoint(kind)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                token = _current.get()
+                if token is not None and token.cancelled:
+                    cancellation_stats.record(kind, wasted_ms=(time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorator
+
+
+class ConnectionScope:
+    """
+    Owns the work started for one socket. Entering the scope installs a CancelToken
+    for the connection (inherited by tasks, to_thread calls and pool submissions made
+    inside it); leaving it (disconnect or error) sets the token and cancels every task
+    started with spawn(), so LLM streams close, queued TTS / STT jobs are skipped and
+    CV calls stop at their next checkpoint.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.token = CancelToken(name)
+        self._tasks: Set[asyncio.Task] = set()
+        self._reset: Optional[contextvars.Token] = None
+
+    def spawn(self, coro: Coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    async def close(self):
+        self.token.cancel()
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.info(f"{self.name} connection closed: cancelled {len(pending)} in-flight task(s)")
+        cancellation_stats.record_connection(self.name, len(pending))
+
+    async def __aenter__(self) -> "ConnectionScope":
+        self._reset = _current.set(self.token)
+        return self
+
+    async def __aexit__(self, *exc):
+        _current.reset(self._reset)
+        await self.close()
@@ -3,6 +3,9 @@ import numpy as np
 import logging
 from typing import Dict, Any, List, Optional, Union
 import os
+import threading
+
+from app.services.cancellation import WorkCancelled, cancellable, checkpoint
 
 try:
     import mediapipe as mp
@@ -25,6 +28,11 @@ class CVEngine:
     def __init__(self):
         self.yolo_model = None
         self.face_mesh = None
+        # Callers run on worker threads, but the models are shared and not thread-safe
+        # (the Face Mesh tracking graph least of all): each model runs one call at a time
+        self._face_mesh_lock = threading.Lock()
+        self._yolo_lock = threading.Lock()
+        self._deepface_lock = threading.Lock()
         
         # Initialize MediaPipe Face Mesh for gaze and liveness
         if mp:
@@ -50,6 +58,7 @@ class CVEngine:
             except Exception as e:
                 logger.error(f"Failed to load YOLO model: {e}")
 
+    @cancellable("cv")
     def verify_identity(self, img1_path: str, img2_path: str) -> Dict[str, Any]:
         """Compares two images using DeepFace."""
         if not DeepFace:
@@ -59,13 +68,15 @@ class CVEngine:
             return {"verified": False, "confidence": 0, "error": "Image paths not found"}
 
         try:
-            result = DeepFace.verify(
-                img1_path=img1_path,
-                img2_path=img2_path,
-                model_name="VGG-Face",
-                enforce_detection=True,
-                detector_backend="opencv"
-            )
+            with self._deepface_lock:
+                checkpoint("cv")
+                result = DeepFace.verify(
+                    img1_path=img1_path,
+                    img2_path=img2_path,
+                    model_name="VGG-Face",
+                    enforce_detection=True,
+                    detector_backend="opencv"
+                )
             similarity = 1 - result["distance"]
             return {
                 "verified": result["verified"],
@@ -73,17 +84,23 @@ class CVEngine:
                 "threshold": result["threshold"],
                 "similarity": similarity
             }
+        except WorkCancelled:
+            raise
         except Exception as e:
             logger.error(f"DeepFace verification failed: {e}")
             return {"verified": False, "confidence": 0, "error": str(e)}
 
+    @cancellable("cv")
     def get_head_pose(self, frame: np.ndarray) -> Dict[str, Any]:
         """Calculates head rotation (yaw, pitch) using landmarks."""
         if not self.face_mesh:
             return {"yaw": 0, "pitch": 0, "detected": False}
             
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
+        with self._face_mesh_lock:
+            # The client may have gone while this call waited for the model
+            checkpoint("cv")
+            results = self.face_mesh.process(rgb_frame)
         
         if not results.multi_face_landmarks:
             return {"yaw": 0, "pitch": 0, "detected": False}
@@ -146,13 +163,16 @@ class CVEngine:
             return "off"
         return "center"
 
+    @cancellable("cv")
     def detect_objects(self, frame: np.ndarray) -> List[Dict[str, Any]]:
         """Detects objects using YOLO."""
         if not self.yolo_model:
             return []
             
         try:
-            results = self.yolo_model(frame, verbose=False)
+            with self._yolo_lock:
+                checkpoint("cv")
+                results = self.yolo_model(frame, verbose=False)
             detections = []
             target_classes = {0: "person", 67: "cell phone", 73: "book"}
             
@@ -165,6 +185,8 @@ class CVEngine:
                             "confidence": float(box.conf[0])
                         })
             return detections
+        except WorkCancelled:
+            raise
         except Exception as e:
             logger.error(f"YOLO detection error: {e}")
             return []
@@ -0,0 +1,131 @@
+import logging
+import os
+from typing import List
+
+import numpy as np
+import onnxruntime as ort
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+from app.core.config import settings
+from app.services.model_residency import model_residency
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaEmbedder:
+    """
+    Embeddings from the Ollama container over HTTP. The legacy /api/embeddings endpoint
+    (one call per text, raw vectors) is what the stored tables were built with; the
+    batched /api/embed returns L2-normalized vectors, which don't mix with those rows.
+    """
+
+    def __init__(self, client, model: str, endpoint: str = "embeddings"):
+        if endpoint not in ("embeddings", "embed"):
+            raise ValueError(f"Unsupported Ollama embedding endpoint: {endpoint}")
+        self.client = client
+        self.model = model
+        self.endpoint = endpoint
+        self.name = f"ollama:{model}" if endpoint == "embed" else f"ollama:{model}:raw"
+
+    def embed(self, texts: List[str]) -> List[list]:
+        keep_alive = model_residency.keep_alive_for("embed")
+        if self.endpoint == "embed":
+            response = self.client.embed(model=self.model, input=texts, keep_alive=keep_alive)
+            model_residency.observe(self.model, response)
+            return response['embeddings']
+
+        vectors = []
+        for text in texts:
+            response = self.client.embeddings(model=self.model, prompt=text, keep_alive=keep_alive)
+            model_residency.observe(self.model, response)
+            vectors.append(response['embedding'])
+        return vectors
+
+
+class OnnxEmbedder:
+    """
+    In-process sentence embeddings on CPU with ONNX Runtime.
+    Mean-pools the last hidden state and L2-normalizes, matching /api/embed output,
+    and truncates to `dim` (Matryoshka-style) so vectors fit the table schema.
+    Tables built with /api/embeddings must be re-embedded before switching to it.
+    """
+
+    def __init__(self, model_path: str, tokenizer_path: str, dim: int = 768, max_length: int = 512,
+                 batch_size: int = 32, intra_op_threads: int = 2, inter_op_threads: int = 1):
+        if Tokenizer is None:
+            raise RuntimeError("tokenizers is not installed")
+        if not os.path.exists(model_path) or not os.path.exists(tokenizer_path):
+            raise RuntimeError(f"ONNX embedding model not found at {model_path}")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.dim = dim
+        self.batch_size = batch_size
+        self.name = f"onnx:{os.path.basename(os.path.dirname(model_path)) or model_path}:{dim}"
+
+    def embed(self, texts: List[str]) -> List[list]:
+        # Dynamic batching: sort by length so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[list] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            for index, vector in zip(indices, self._embed_batch([texts[i] for i in indices])):
+                vectors[index] = vector
+        return vectors
+
+    def _embed_batch(self, texts: List[str]) -> List[list]:
+        encodings = self.tokenizer.encode_batch(texts)
+        length = max(len(e.ids) for e in encodings)
+        input_ids = np.zeros((len(texts), length), dtype=np.int64)
+        attention_mask = np.zeros((len(texts), length), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            input_ids[row, :len(encoding.ids)] = encoding.ids
+            attention_mask[row, :len(encoding.attention_mask)] = encoding.attention_mask
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self.session.run(None, feeds)[0]
+        if hidden.shape[-1] < self.dim:
+            raise RuntimeError(f"ONNX embedding model outputs {hidden.shape[-1]} dims, expected {self.dim}")
+
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = pooled[:, :self.dim]
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+
+def build_embedder(client, model: str):
+    """
+    Picks the embedding backend from EMBED_BACKEND, falling back to Ollama
+    if the ONNX model can't be loaded.
+    """
+    if settings.EMBED_BACKEND == "onnx":
+        try:
+            embedder = OnnxEmbedder(
+                settings.EMBED_ONNX_MODEL_PATH,
+                settings.EMBED_ONNX_TOKENIZER_PATH,
+                dim=settings.EMBED_DIM,
+                max_length=settings.EMBED_ONNX_MAX_LENGTH,
+                batch_size=settings.EMBED_BATCH_SIZE,
+                intra_op_threads=settings.EMBED_ONNX_INTRA_OP_THREADS,
+                inter_op_threads=settings.EMBED_ONNX_INTER_OP_THREADS,
+            )
+            logger.info("✔ ONNX embedding backend initialized")
+            return embedder
+        except Exception as e:
+            logger.warning(f"Failed to initialize ONNX embedding backend, using Ollama: {e}")
+    return OllamaEmbedder(client, model, endpoint=settings.OLLAMA_EMBED_ENDPOINT)
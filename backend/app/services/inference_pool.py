@@ -0,0 +1,115 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from app.services.cancellation import cancellation_stats, current_token
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class InferencePool:
+    """
+    A fixed set of worker threads, each owning one model instance (e.g. its own
+    ONNX session). Jobs queue in FIFO order and run as fn(engine, *args) on the
+    first free worker, so concurrent callers never share a session and the event
+    loop only awaits a future. Queue depth, wait time and run time are tracked.
+    Jobs submitted inside a ConnectionScope carry its cancel token: they are skipped
+    if the client disconnects while they are queued, and a run that was already under
+    way when it did is counted as wasted (an ONNX run cannot be interrupted).
+    """
+
+    def __init__(self, name: str, engines: List[Any]):
+        self.name = name
+        self.engines = engines
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._loop, args=(engine,), name=f"{name}-{i}", daemon=True)
+            for i, engine in enumerate(engines)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.engines)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Thread-safe. Await from asyncio with asyncio.wrap_future()."""
+        future: Future = Future()
+        if not self.engines:
+            future.set_exception(RuntimeError(f"{self.name} pool has no engines"))
+            return future
+        self._queue.put((fn, args, future, current_token(), time.perf_counter()))
+        return future
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(_STOP)
+
+    def _loop(self, engine: Any):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            fn, args, future, token, enqueued = item
+            if token is not None and token.cancelled:
+                future.cancel()
+            # Skip callers that gave up while queued (e.g. a cancelled asyncio waiter)
+            if not future.set_running_or_notify_cancel():
+                with self._lock:
+                    self.cancelled += 1
+                cancellation_stats.record(self.name, cancelled=1)
+                continue
+
+            started = time.perf_counter()
+            ok = False
+            with self._lock:
+                self.busy += 1
+            try:
+                future.set_result(fn(engine, *args))
+                ok = True
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                finished = time.perf_counter()
+                if token is not None and token.cancelled:
+                    cancellation_stats.record(self.name, wasted_ms=(finished - started) * 1000)
+                with self._lock:
+                    self.busy -= 1
+                    wait_ms = (started - enqueued) * 1000
+                    self.total_wait_ms += wait_ms
+                    self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                    self.total_run_ms += (finished - started) * 1000
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            served = self.completed + self.failed
+            return {
+                "workers": self.size,
+                "queued": self._queue.qsize(),
+                "busy": self.busy,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "avg_wait_ms": round(self.total_wait_ms / served, 1) if served else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 1),
+                "avg_run_ms": round(self.total_run_ms / served, 1) if served else 0.0,
+            }
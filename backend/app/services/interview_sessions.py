@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.brain import brain_service
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough llama-family token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class InterviewSession:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.summary = ""
+        self.turns: List[dict] = []
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.turn_count = 0
+        # Serializes turns so concurrent requests for one interview don't interleave
+        self.lock = asyncio.Lock()
+        self._compaction: Optional[asyncio.Task] = None
+
+    def history(self) -> List[dict]:
+        """
+        Prompt history for the next turn: the running summary (as a system note) then
+        the recent turns verbatim. The summary only changes when a block of turns is
+        folded in, so the prompt prefix stays stable between compactions.
+        """
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": f"Notes on the interview so far: {self.summary}"})
+        messages.extend(self.turns)
+        return messages
+
+    def history_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(estimate_tokens(t["content"]) for t in self.turns)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "summary": self.summary,
+            "turns": list(self.turns),
+            "turn_count": self.turn_count,
+            "history_tokens": self.history_tokens(),
+            "created_at": self.created_at,
+            "last_active": self.last_active,
+        }
+
+
+class InterviewSessionStore:
+    """
+    Server-side conversation state for Aria interviews.
+    - Recent turns are kept verbatim while they fit `token_budget`.
+    - Past the budget, the oldest block of turns (down to half the budget) is folded
+      into a running summary in the background, so the reply path never waits on it.
+    - If summarization falls behind or fails, the oldest turns are dropped once the
+      history exceeds twice the budget, keeping per-turn prompt size bounded.
+    """
+
+    def __init__(self, token_budget: int = 1500, min_recent_messages: int = 4,
+                 summary_max_words: int = 200, ttl_seconds: int = 7200, max_sessions: int = 1000):
+        self.token_budget = token_budget
+        self.min_recent_messages = min_recent_messages
+        self.summary_max_words = summary_max_words
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, InterviewSession] = {}
+
+        self.compactions = 0
+        self.compaction_failures = 0
+        self.truncations = 0
+
+    def open(self, session_id: Optional[str] = None, history: Optional[List[dict]] = None) -> InterviewSession:
+        """
+        Returns the live session for `session_id`, or starts a new one seeded with
+        `history` (for clients that still send the full history).
+        """
+        self._evict_expired()
+        session = self.sessions.get(session_id) if session_id else None
+        if session is None:
+            session = InterviewSession(session_id or uuid.uuid4().hex)
+            for msg in history or []:
+                if msg.get("role") in ("user", "assistant") and msg.get("content"):
+                    session.turns.append({"role": msg["role"], "content": msg["content"]})
+            self.sessions[session.session_id] = session
+            self._enforce_limits(session)
+        session.last_active = time.time()
+        return session
+
+    def get(self, session_id: str) -> Optional[InterviewSession]:
+        return self.sessions.get(session_id)
+
+    def close(self, session_id: str) -> bool:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        if session._compaction and not session._compaction.done():
+            session._compaction.cancel()
+        return True
+
+    def record(self, session: InterviewSession, user_input: str, reply: str):
+        """Appends a completed turn and schedules compaction if the budget is exceeded."""
+        session.turns.append({"role": "user", "content": user_input})
+        session.turns.append({"role": "assistant", "content": reply})
+        session.turn_count += 1
+        session.last_active = time.time()
+        self._enforce_limits(session)
+
+    def _enforce_limits(self, session: InterviewSession):
+        if session.history_tokens() > 2 * self.token_budget:
+            self._truncate(session)
+        if session.history_tokens() > self.token_budget and (session._compaction is None or session._compaction.done()):
+            try:
+                session._compaction = asyncio.get_running_loop().create_task(self._compact(session))
+            except RuntimeError:
+                # No running loop (sync caller): fall back to plain truncation
+                self._truncate(session)
+
+    def _fold_count(self, session: InterviewSession) -> int:
+        """How many of the oldest messages to fold so the rest fits half the budget."""
+        target = self.token_budget // 2
+        remaining = session.history_tokens() - estimate_tokens(session.summary)
+        count = 0
+        while len(session.turns) - count > self.min_recent_messages and remaining > target:
+            remaining -= estimate_tokens(session.turns[count]["content"])
+            count += 1
+        # Fold whole user/assistant pairs
+        return count + (count % 2)
+
+    def _truncate(self, session: InterviewSession):
+        count = self._fold_count(session)
+        if count:
+            del session.turns[:count]
+            self.truncations += 1
+            logger.warning(f"Interview session {session.session_id}: dropped {count} messages over token budget")
+
+    async def _compact(self, session: InterviewSession):
+        count = self._fold_count(session)
+        if not count:
+            return
+        folded = session.turns[:count]
+        summary = await brain_service.summarize_conversation_async(session.summary, folded, self.summary_max_words)
+        if summary is None:
+            self.compaction_failures += 1
+            return
+        # New turns may have been appended meanwhile; only the folded prefix is replaced
+        if session.turns[:count] == folded:
+            session.summary = summary
+            del session.turns[:count]
+            self.compactions += 1
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [sid for sid, s in self.sessions.items() if now - s.last_active > self.ttl_seconds]
+        if len(self.sessions) - len(expired) >= self.max_sessions:
+            idle_first = sorted(self.sessions.values(), key=lambda s: s.last_active)
+            expired += [s.session_id for s in idle_first[:len(self.sessions) - self.max_sessions + 1]]
+        for sid in set(expired):
+            self.close(sid)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "token_budget": self.token_budget,
+            "compactions": self.compactions,
+            "compaction_failures": self.compaction_failures,
+            "truncations": self.truncations,
+        }
+
+
+interview_sessions = InterviewSessionStore(
+    token_budget=settings.INTERVIEW_HISTORY_TOKEN_BUDGET,
+    min_recent_messages=settings.INTERVIEW_MIN_RECENT_MESSAGES,
+    summary_max_words=settings.INTERVIEW_SUMMARY_MAX_WORDS,
+    ttl_seconds=settings.INTERVIEW_SESSION_TTL_SECONDS,
+    max_sessions=settings.INTERVIEW_MAX_SESSIONS,
+)
@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.model_residency import model_residency
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+class _Waiter:
+    __slots__ = ("cls", "model", "priority", "enqueued", "seq", "future")
+
+    def __init__(self, cls: str, model: Optional[str], seq: int):
+        self.cls = cls
+        self.model = model
+        self.priority = PRIORITIES[cls]
+        self.enqueued = time.monotonic()
+        self.seq = seq
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class LLMScheduler:
+    """
+    Admission control in front of Ollama.
+    - A global cap on in-flight generations plus a cap per priority class,
+      so batch analysis can never occupy every slot.
+    - Free slots go to the highest-priority waiter (interactive chat first).
+    - Aging: every `aging_seconds` a request waits lowers its priority value by one,
+      so queued batch work eventually competes with new interactive turns.
+    - Within the same effective priority, requests for an already-resident model go
+      first, so batch analysis runs grouped by model instead of forcing swaps.
+    """
+
+    def __init__(self, max_in_flight: int = 4, class_limits: Dict[str, int] = None,
+                 aging_seconds: float = 10.0):
+        self.max_in_flight = max_in_flight
+        self.class_limits = class_limits or {"interactive": max_in_flight, "batch": max(1, max_in_flight // 2)}
+        self.aging_seconds = aging_seconds
+
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self.in_flight = {cls: 0 for cls in PRIORITIES}
+        self.metrics = {cls: {"served": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0} for cls in PRIORITIES}
+
+    @asynccontextmanager
+    async def slot(self, cls: str, model: Optional[str] = None):
+        """Holds one generation slot of the given class for the duration of the block."""
+        await self._acquire(cls, model)
+        try:
+            yield
+        finally:
+            self._release(cls)
+
+    async def _acquire(self, cls: str, model: Optional[str]):
+        waiter = _Waiter(cls, model, next(self._seq))
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._release(cls)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+        waited_ms = (time.monotonic() - waiter.enqueued) * 1000
+        metrics = self.metrics[cls]
+        metrics["served"] += 1
+        metrics["total_wait_ms"] += waited_ms
+        metrics["max_wait_ms"] = max(metrics["max_wait_ms"], waited_ms)
+
+    def _release(self, cls: str):
+        self.in_flight[cls] -= 1
+        self._dispatch()
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> float:
+        if self.aging_seconds <= 0:
+            return waiter.priority
+        return waiter.priority - int((now - waiter.enqueued) / self.aging_seconds)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while sum(self.in_flight.values()) < self.max_in_flight:
+            eligible = [
+                w for w in self._waiters
+                if self.in_flight[w.cls] < self.class_limits.get(w.cls, self.max_in_flight)
+            ]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda w: (
+                self._effective_priority(w, now),
+                0 if model_residency.is_loaded(w.model) else 1,
+                w.seq,
+            ))
+            self._waiters.remove(waiter)
+            if waiter.future.cancelled():
+                continue
+            self.in_flight[waiter.cls] += 1
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = {cls: 0 for cls in PRIORITIES}
+        for waiter in self._waiters:
+            queued[waiter.cls] += 1
+        return {
+            "max_in_flight": self.max_in_flight,
+            "classes": {
+                cls: {
+                    "queued": queued[cls],
+                    "in_flight": self.in_flight[cls],
+                    "limit": self.class_limits.get(cls, self.max_in_flight),
+                    "served": m["served"],
+                    "avg_wait_ms": round(m["total_wait_ms"] / m["served"], 1) if m["served"] else 0.0,
+                    "max_wait_ms": round(m["max_wait_ms"], 1),
+                }
+                for cls, m in self.metrics.items()
+            },
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+    class_limits={
+        "interactive": settings.LLM_INTERACTIVE_MAX_IN_FLIGHT,
+        "batch": settings.LLM_BATCH_MAX_IN_FLIGHT,
+    },
+    aging_seconds=settings.LLM_AGING_SECONDS,
+)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Responses whose load_duration exceeds this were cold loads (weights read from disk)
+COLD_LOAD_THRESHOLD_SECONDS = 0.5
+
+
+class ModelResidencyManager:
+    """
+    Keeps Ollama from thrashing between phi3.5 / llama3.2 / nomic-embed-text.
+    - Every request carries a per-model keep_alive.
+    - The scheduler prefers queued work for models that are already resident.
+    - The chat model is pinned (keep_alive=-1) while interviews are live, and
+      released back to its normal keep_alive once they go idle.
+    - A background poll of /api/ps tracks which models are resident and counts
+      loads/unloads; response load_duration measures swap-induced latency.
+    """
+
+    def __init__(self, keep_alive: Dict[str, str], default_keep_alive: str = "5m",
+                 pin_idle_seconds: float = 300.0, poll_seconds: float = 5.0):
+        # role ("chat" / "analysis" / "embed") -> keep_alive and model name
+        self.keep_alive = keep_alive
+        self.default_keep_alive = default_keep_alive
+        self.models: Dict[str, str] = {}
+        self.pin_idle_seconds = pin_idle_seconds
+        self.poll_seconds = poll_seconds
+
+        self.active_interviews = 0
+        self._last_chat: Optional[float] = None
+        self._pinned = False
+
+        self.loaded: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, Dict[str, float]] = {}
+
+    def register(self, role: str, model: str):
+        self.models[role] = model
+
+    def _canonical(self, name: str) -> str:
+        """Maps an /api/ps tag like "phi3.5:latest" back to the registered model name."""
+        for model in self.models.values():
+            if name == model or name.startswith(f"{model}:"):
+                return model
+        return name
+
+    def _model_counters(self, model: str) -> Dict[str, float]:
+        return self.counters.setdefault(self._canonical(model), {"loads": 0, "unloads": 0, "cold_loads": 0, "load_seconds": 0.0})
+
+    # --- Pinning ---
+
+    @asynccontextmanager
+    async def interview(self):
+        """Marks an interview as live for the duration of the block (e.g. a voice socket)."""
+        self.active_interviews += 1
+        try:
+            yield
+        finally:
+            self.active_interviews -= 1
+            self._last_chat = time.monotonic()
+
+    def note_chat_turn(self):
+        self._last_chat = time.monotonic()
+
+    def chat_pinned(self) -> bool:
+        if self.active_interviews > 0:
+            return True
+        return self._last_chat is not None and time.monotonic() - self._last_chat < self.pin_idle_seconds
+
+    def keep_alive_for(self, role: str) -> Union[str, int]:
+        if role == "chat" and self.chat_pinned():
+            return -1
+        return self.keep_alive.get(role, self.default_keep_alive)
+
+    def is_loaded(self, model: Optional[str]) -> bool:
+        if not model:
+            return False
+        return any(name == model or name.startswith(f"{model}:") for name in self.loaded)
+
+    # --- Observation ---
+
+    def observe(self, model: str, response: Any):
+        """Records load_duration (ns) from a generate/chat/embed response."""
+        try:
+            load_ns = response.get("load_duration") or 0
+        except AttributeError:
+            load_ns = getattr(response, "load_duration", 0) or 0
+        load_seconds = load_ns / 1e9
+        if load_seconds >= COLD_LOAD_THRESHOLD_SECONDS:
+            counters = self._model_counters(model)
+            counters["cold_loads"] += 1
+            counters["load_seconds"] += load_seconds
+
+    async def run(self, client):
+        """Background loop: poll resident models and release the chat pin when idle."""
+        while True:
+            try:
+                await self._poll(client)
+                chat_model = self.models.get("chat")
+                if self._pinned and not self.chat_pinned() and self.is_loaded(chat_model):
+                    # An empty generate just updates keep_alive for a resident model
+                    await client.generate(model=chat_model, prompt="", keep_alive=self.keep_alive_for("chat"))
+                    logger.info(f"Released keep-alive pin on {chat_model}")
+                self._pinned = self.chat_pinned()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Model residency poll failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _poll(self, client):
+        response = await client.ps()
+        models = response.get("models", []) if isinstance(response, dict) else getattr(response, "models", [])
+
+        current: Dict[str, Dict[str, Any]] = {}
+        for m in models:
+            get = m.get if isinstance(m, dict) else lambda k, _m=m: getattr(_m, k, None)
+            name = get("model") or get("name")
+            current[name] = {"size_vram": get("size_vram"), "expires_at": str(get("expires_at"))}
+
+        for name in current.keys() - self.loaded.keys():
+            self._model_counters(name)["loads"] += 1
+        for name in self.loaded.keys() - current.keys():
+            self._model_counters(name)["unloads"] += 1
+        self.loaded = current
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "active_interviews": self.active_interviews,
+            "chat_pinned": self.chat_pinned(),
+            "keep_alive": {self.models.get(role, role): self.keep_alive_for(role) for role in self.keep_alive},
+            "counters": {model: {**c, "load_seconds": round(c["load_seconds"], 2)} for model, c in self.counters.items()},
+        }
+
+
+model_residency = ModelResidencyManager(
+    keep_alive={
+        "chat": settings.OLLAMA_KEEP_ALIVE_CHAT,
+        "analysis": settings.OLLAMA_KEEP_ALIVE_ANALYSIS,
+        "embed": settings.OLLAMA_KEEP_ALIVE_EMBED,
+    },
+    pin_idle_seconds=settings.OLLAMA_CHAT_PIN_IDLE_SECONDS,
+    poll_seconds=settings.OLLAMA_RESIDENCY_POLL_SECONDS,
+)
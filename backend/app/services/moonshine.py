@@ -0,0 +1,52 @@
+import os
+from typing import List
+
+import numpy as np
+
+try:
+    import sherpa_onnx
+except ImportError:
+    sherpa_onnx = None
+
+# Moonshine models take 16 kHz mono input
+SAMPLE_RATE = 16000
+
+# Kept free of app.services.voice (and its import-time model loading): spawned
+# transcription processes import this module to run their worker entry points.
+
+
+def load_moonshine(moonshine_dir: str, num_threads: int = 1):
+    """Builds a Moonshine OfflineRecognizer from the sherpa-onnx model directory."""
+    return sherpa_onnx.OfflineRecognizer.from_moonshine(
+        preprocessor=os.path.join(moonshine_dir, "preprocess.onnx"),
+        encoder=os.path.join(moonshine_dir, "encode.int8.onnx"),
+        uncached_decoder=os.path.join(moonshine_dir, "uncached_decode.int8.onnx"),
+        cached_decoder=os.path.join(moonshine_dir, "cached_decode.int8.onnx"),
+        tokens=os.path.join(moonshine_dir, "tokens.txt"),
+        num_threads=num_threads,
+    )
+
+
+def decode_batch(recognizer, segments: List[np.ndarray]) -> List[str]:
+    """Decodes several 16 kHz segments in one batched sherpa-onnx call."""
+    streams = []
+    for samples in segments:
+        stream = recognizer.create_stream()
+        stream.accept_waveform(SAMPLE_RATE, samples)
+        streams.append(stream)
+    recognizer.decode_streams(streams)
+    return [stream.result.text.strip() for stream in streams]
+
+
+# --- Decode process side ---
+
+_recognizer = None
+
+
+def init_worker(moonshine_dir: str, num_threads: int):
+    global _recognizer
+    _recognizer = load_moonshine(moonshine_dir, num_threads)
+
+
+def decode_in_worker(segments: List[np.ndarray]) -> List[str]:
+    return decode_batch(_recognizer, segments)
@@ -1,35 +1,240 @@
-import io
+import re
+import json
+import hashlib
 import logging
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import pypdfium2 as pdfium
 from docling.document_converter import DocumentConverter
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+from app.core.config import settings
+from app.core.cache import LRUCache, DiskCache
+from app.services.pdf_pool import pdf_pool, docling_to_markdown
 
 logger = logging.getLogger(__name__)
 
+# Bump when the fast-path extraction or markdown heuristics change
+PARSER_VERSION = "2"
+
+_WORD_RE = re.compile(r"^[A-Za-z][A-Za-z'\-\.]{0,24}[,;:]?$")
+
 class PDFService:
     def __init__(self):
-        # Initialize the converter. 
-        # Note: In a production environment with OOM constraints, 
-        # you might want to initialize this lazily or manage its lifecycle.
-        self.converter = DocumentConverter()
+        # In-process converter, only built when the worker pool is disabled.
+        # With the pool enabled each worker process owns its own converter.
+        self._converter = None
+
+        # Fans page ranges of one large document out to the worker pool
+        self._range_executor = ThreadPoolExecutor(max_workers=max(1, pdf_pool.size), thread_name_prefix="pdf-ranges")
+
+        # Content-addressed parse cache: memory LRU in front of a size-bounded disk tier
+        self.memory_cache = LRUCache(max_entries=settings.PDF_CACHE_MEMORY_ENTRIES)
+        self.disk_cache = DiskCache(settings.PDF_CACHE_DIR, max_bytes=settings.PDF_CACHE_DISK_MB * 1024 * 1024)
+        self.cache_namespace = self._converter_fingerprint()
+
+        self.tier_counts = {"cache": 0, "text_layer": 0, "docling": 0}
+
+    def _converter_fingerprint(self) -> str:
+        """
+        Hash of the Docling version and converter options, so an upgrade or
+        a config change never serves markdown produced by the old pipeline.
+        """
+        try:
+            docling_version = metadata.version("docling")
+        except metadata.PackageNotFoundError:
+            docling_version = "unknown"
+
+        try:
+            # DocumentConverter() uses the default PDF pipeline options
+            options = PdfPipelineOptions().model_dump_json()
+        except Exception:
+            options = ""
+
+        raw = json.dumps({
+            "parser": PARSER_VERSION,
+            "docling": docling_version,
+            "options": options,
+            "fast_path": [settings.PDF_FASTPATH_ENABLED, settings.PDF_FASTPATH_MIN_CHARS_PER_PAGE],
+            "pages": [settings.PDF_MAX_PAGES, settings.PDF_PAGE_CHUNK_SIZE],
+        }, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def cache_key(self, file_bytes: bytes) -> str:
+        digest = hashlib.sha256(file_bytes).hexdigest()
+        return hashlib.sha256(f"{self.cache_namespace}:{digest}".encode("utf-8")).hexdigest()
 
     def parse_resume(self, file_bytes: bytes) -> str:
         """
-        Parses PDF bytes into Markdown using Docling.
+        Parses PDF bytes into Markdown.
+        """
+        return self.parse(file_bytes)["markdown"]
+
+    def parse(self, file_bytes: bytes) -> dict:
+        """
+        Tiered parse returning {"markdown", "tier"}.
+        Repeat uploads of identical bytes are served from the parse cache (tier "cache"); otherwise
+        born-digital PDFs use their text layer and only scanned or garbled documents
+        escalate to the full Docling layout/OCR pipeline.
+        """
+        key = self.cache_key(file_bytes)
+
+        result = self.memory_cache.get(key)
+        if result is None:
+            result = self.disk_cache.get(key)
+            if result is not None:
+                self.memory_cache.set(key, result)
+        if result is not None:
+            self.tier_counts["cache"] += 1
+            return {**result, "tier": "cache"}
+
+        markdown_content = self._extract_text_layer(file_bytes) if settings.PDF_FASTPATH_ENABLED else None
+        if markdown_content is not None:
+            result = {"markdown": markdown_content, "tier": "text_layer"}
+        else:
+            result = {"markdown": self._convert(file_bytes), "tier": "docling"}
+        self.tier_counts[result["tier"]] += 1
+
+        self.memory_cache.set(key, result)
+        self.disk_cache.set(key, result)
+        return result
+
+    def _extract_text_layer(self, file_bytes: bytes) -> Optional[str]:
+        """
+        Reads the embedded text layer with pdfium. Returns None when the text
+        is missing or fails the quality check, so the caller falls back to Docling.
+        """
+        try:
+            pdf = pdfium.PdfDocument(file_bytes)
+        except Exception as e:
+            logger.warning(f"pdfium could not open document, escalating to Docling: {e}")
+            return None
+
+        pages: List[str] = []
+        try:
+            page_count = len(pdf)
+            if settings.PDF_MAX_PAGES:
+                page_count = min(page_count, settings.PDF_MAX_PAGES)
+            for index in range(page_count):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+        except Exception as e:
+            logger.warning(f"Text layer extraction failed, escalating to Docling: {e}")
+            return None
+        finally:
+            pdf.close()
+
+        if not self._text_layer_ok(pages):
+            return None
+        return self._text_to_markdown(pages)
+
+    def _text_layer_ok(self, pages: List[str]) -> bool:
+        """
+        Cheap heuristics for "this text layer is good enough for the LLM":
+        enough text per page, no mostly-empty (scanned) pages, and mostly real words
+        rather than broken glyph mappings.
         """
+        if not pages:
+            return False
+
+        text = "\n".join(pages)
+        stripped = [p.strip() for p in pages]
+        if len(text.strip()) < settings.PDF_FASTPATH_MIN_CHARS_PER_PAGE * len(pages):
+            return False
+        if sum(1 for p in stripped if len(p) < 20) > len(pages) * 0.25:
+            return False
+        if text.count("\ufffd") > len(text) * 0.01 or "(cid:" in text:
+            return False
+
+        tokens = text.split()
+        if not tokens:
+            return False
+        wordlike = sum(1 for t in tokens if _WORD_RE.match(t))
+        return wordlike / len(tokens) >= 0.45
+
+    def _text_to_markdown(self, pages: List[str]) -> str:
+        """
+        Light structure recovery: short all-caps or colon-terminated lines become headings.
+        """
+        lines = []
+        for page in pages:
+            for raw_line in page.replace("\r", "\n").split("\n"):
+                line = " ".join(raw_line.split())
+                if not line:
+                    if lines and lines[-1]:
+                        lines.append("")
+                    continue
+                letters = [c for c in line if c.isalpha()]
+                is_heading = len(line) <= 40 and letters and (
+                    all(c.isupper() for c in letters) or (line.endswith(":") and len(line.split()) <= 4)
+                )
+                if is_heading:
+                    if lines and lines[-1]:
+                        lines.append("")
+                    lines.append(f"## {line.rstrip(':').title()}")
+                    lines.append("")
+                else:
+                    lines.append(line)
+            lines.append("")
+        return "\n".join(lines).strip()
+
+    @property
+    def converter(self) -> DocumentConverter:
+        if self._converter is None:
+            self._converter = DocumentConverter()
+        return self._converter
+
+    def _page_count(self, file_bytes: bytes) -> int:
+        try:
+            pdf = pdfium.PdfDocument(file_bytes)
+        except Exception:
+            return 0
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def _page_ranges(self, file_bytes: bytes) -> List[Optional[Tuple[int, int]]]:
+        """
+        Splits the (page-capped) document into 1-based inclusive ranges of
+        PDF_PAGE_CHUNK_SIZE pages. Small documents stay a single job.
+        """
+        last = self._page_count(file_bytes)
+        if not last:
+            # Unknown length: let Docling read it, still honouring the cap
+            return [(1, settings.PDF_MAX_PAGES) if settings.PDF_MAX_PAGES else None]
+        if settings.PDF_MAX_PAGES:
+            last = min(last, settings.PDF_MAX_PAGES)
+
+        chunk = settings.PDF_PAGE_CHUNK_SIZE
+        if chunk <= 0 or pdf_pool.size <= 1 or last <= chunk:
+            return [(1, last)]
+        return [(start, min(start + chunk - 1, last)) for start in range(1, last + 1, chunk)]
+
+    def _convert(self, file_bytes: bytes) -> str:
+        ranges = self._page_ranges(file_bytes)
+
+        if pdf_pool.size > 0:
+            if len(ranges) == 1:
+                return pdf_pool.convert(file_bytes, ranges[0])
+            # Convert ranges on separate workers and stitch them back in page order
+            parts = self._range_executor.map(lambda page_range: pdf_pool.convert(file_bytes, page_range), ranges)
+            return "\n\n".join(part.strip() for part in parts if part.strip())
+
         try:
-            # Docling handles bytes via a stream or file path
-            # For simplicity, we'll use a source wrapper if needed, 
-            # but usually it accepts local paths or URLs.
-            # We'll write to a temp buffer if required by the specific docling version.
-            
-            # Implementation for 2026: Assuming direct byte/stream support
-            result = self.converter.convert(file_bytes)
-            
-            # Export to markdown for optimal LLM consumption
-            markdown_content = result.document.export_to_markdown()
-            
-            return markdown_content
+            return docling_to_markdown(self.converter, file_bytes, ranges[0])
         except Exception as e:
             logger.error(f"Error parsing PDF with Docling: {e}")
             raise RuntimeError(f"Failed to parse PDF: {str(e)}")
 
+    def cache_stats(self) -> dict:
+        return {"memory": self.memory_cache.stats(), "disk": self.disk_cache.stats()}
+
+    def tier_stats(self) -> dict:
+        return dict(self.tier_counts)
+
 pdf_service = PDFService()
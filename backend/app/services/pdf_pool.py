@@ -0,0 +1,236 @@
+import io
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# spawn keeps children free of the API process' threads and loaded models
+_ctx = mp.get_context("spawn")
+
+
+def docling_to_markdown(converter, file_bytes: bytes, page_range: Optional[Tuple[int, int]] = None) -> str:
+    """
+    Runs one Docling conversion from in-memory bytes and exports Markdown.
+    Shared by the in-process path and the pool workers.
+    page_range is 1-based and inclusive, as Docling expects.
+    """
+    from docling.datamodel.base_models import DocumentStream
+
+    source = DocumentStream(name="resume.pdf", stream=io.BytesIO(file_bytes))
+    if page_range:
+        result = converter.convert(source, page_range=page_range)
+    else:
+        result = converter.convert(source)
+    return result.document.export_to_markdown()
+
+
+def _rss_mb(pid: Optional[int] = None) -> float:
+    """Resident set size in MB, read from /proc (Linux containers)."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+def _worker_main(conn):
+    """
+    Child process loop: build one converter, then convert documents until told
+    to stop. Every reply carries the child's RSS so the parent can recycle it.
+    """
+    from docling.document_converter import DocumentConverter
+
+    converter = DocumentConverter()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        file_bytes, page_range = task
+        try:
+            markdown_content = docling_to_markdown(converter, file_bytes, page_range)
+            conn.send(("ok", markdown_content, _rss_mb()))
+        except Exception as e:
+            conn.send(("error", str(e), _rss_mb()))
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.docs = 0
+        self.rss_mb = 0.0
+
+    def spawn(self):
+        parent_conn, child_conn = _ctx.Pipe()
+        self.process = _ctx.Process(target=_worker_main, args=(child_conn,), daemon=True,
+                                    name=f"pdf-worker-{self.index}")
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.docs = 0
+        self.rss_mb = 0.0
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self, graceful: bool = True):
+        if self.process is None:
+            return
+        try:
+            if graceful and self.process.is_alive():
+                self.conn.send(None)
+                self.process.join(timeout=5)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+
+class PDFConversionPool:
+    """
+    Fixed set of Docling worker processes, each with its own converter.
+    - Workers are recycled after max_docs_per_child documents or once their RSS
+      nears the ceiling, so model memory growth can't accumulate in the API.
+    - A document that exceeds the timeout or the RSS ceiling mid-conversion has its
+      worker killed and replaced; only that document fails.
+    """
+
+    def __init__(self, workers: int = 2, max_docs_per_child: int = 50,
+                 max_rss_mb: int = 2048, timeout_seconds: float = 120.0):
+        self.size = workers
+        self.max_docs_per_child = max_docs_per_child
+        self.max_rss_mb = max_rss_mb
+        self.timeout_seconds = timeout_seconds
+
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+        self.waiting = 0
+        self.busy = 0
+        self.counters = {"converted": 0, "failed": 0, "timeouts": 0, "memory_kills": 0,
+                         "crashes": 0, "recycles": 0}
+        self._total_wait_ms = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._started or self.size <= 0:
+                return
+            for index in range(self.size):
+                worker = _Worker(index)
+                worker.spawn()
+                self._workers.append(worker)
+                self._idle.put(worker)
+            self._started = True
+            logger.info(f"✔ PDF conversion pool started with {self.size} workers")
+
+    def shutdown(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+            self._idle = queue.Queue()
+            self._started = False
+
+    def convert(self, file_bytes: bytes, page_range: Optional[Tuple[int, int]] = None) -> str:
+        """
+        Blocking call (run it from a thread). Raises RuntimeError on failure.
+        """
+        self.start()
+
+        enqueued = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        worker = self._idle.get()
+        with self._lock:
+            self.waiting -= 1
+            self.busy += 1
+            self._total_wait_ms += (time.perf_counter() - enqueued) * 1000
+
+        try:
+            if not worker.alive():
+                worker.spawn()
+            return self._run(worker, file_bytes, page_range)
+        finally:
+            with self._lock:
+                self.busy -= 1
+            self._idle.put(worker)
+
+    def _run(self, worker: _Worker, file_bytes: bytes, page_range: Optional[Tuple[int, int]]) -> str:
+        worker.conn.send((file_bytes, page_range))
+
+        deadline = time.monotonic() + self.timeout_seconds
+        while not worker.conn.poll(0.25):
+            if not worker.alive():
+                self._replace(worker, "crashes")
+                raise RuntimeError("Failed to parse PDF: conversion worker crashed")
+            if time.monotonic() > deadline:
+                self._replace(worker, "timeouts")
+                raise RuntimeError(f"Failed to parse PDF: conversion exceeded {self.timeout_seconds}s")
+            worker.rss_mb = _rss_mb(worker.process.pid)
+            if self.max_rss_mb and worker.rss_mb > self.max_rss_mb:
+                self._replace(worker, "memory_kills")
+                raise RuntimeError(f"Failed to parse PDF: conversion exceeded {self.max_rss_mb} MB")
+
+        try:
+            status, payload, rss_mb = worker.conn.recv()
+        except EOFError:
+            self._replace(worker, "crashes")
+            raise RuntimeError("Failed to parse PDF: conversion worker crashed")
+
+        worker.docs += 1
+        worker.rss_mb = rss_mb
+        if worker.docs >= self.max_docs_per_child or (self.max_rss_mb and rss_mb > self.max_rss_mb * 0.8):
+            self._replace(worker, "recycles", graceful=True)
+
+        if status != "ok":
+            self.counters["failed"] += 1
+            raise RuntimeError(f"Failed to parse PDF: {payload}")
+        self.counters["converted"] += 1
+        return payload
+
+    def _replace(self, worker: _Worker, reason: str, graceful: bool = False):
+        self.counters[reason] += 1
+        if reason != "recycles":
+            self.counters["failed"] += 1
+            logger.warning(f"PDF worker {worker.index} replaced ({reason})")
+        worker.stop(graceful=graceful)
+        worker.spawn()
+
+    def stats(self) -> Dict[str, Any]:
+        served = self.counters["converted"] + self.counters["failed"]
+        return {
+            "workers": self.size,
+            "queue_depth": self.waiting,
+            "busy": self.busy,
+            "avg_queue_wait_ms": round(self._total_wait_ms / served, 1) if served else 0.0,
+            **self.counters,
+            "worker_rss_mb": [round(w.rss_mb, 1) for w in self._workers],
+            "worker_docs": [w.docs for w in self._workers],
+        }
+
+
+pdf_pool = PDFConversionPool(
+    workers=settings.PDF_POOL_WORKERS,
+    max_docs_per_child=settings.PDF_POOL_MAX_DOCS_PER_CHILD,
+    max_rss_mb=settings.PDF_POOL_MAX_RSS_MB,
+    timeout_seconds=settings.PDF_POOL_TIMEOUT_SECONDS,
+)
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from app.services.cv_engine import cv_engine
@@ -46,7 +47,8 @@ class SentinelIdentityService:
         target_challenge = challenges[current_idx]
 
         # Verify current rotation/action
-        is_valid = cv_engine.check_liveness_action(frame, target_challenge)
+        # CV runs off the event loop so other sockets stay responsive
+        is_valid = await asyncio.to_thread(cv_engine.check_liveness_action, frame, target_challenge)
         if not is_valid:
             return {
                 "verified": False, 
@@ -85,7 +87,8 @@ class SentinelIdentityService:
             return {"verified": False, "error": "Waiting for ID and Profile photo uploads."}
 
         # 1. Compare Reference Profile Photo vs Gov ID
-        id_match = cv_engine.verify_identity(
+        id_match = await asyncio.to_thread(
+            cv_engine.verify_identity,
             session["id_card_path"], 
             session["profile_photo_path"]
         )
@@ -95,7 +98,8 @@ class SentinelIdentityService:
         if not center_frame_path:
              return {"verified": False, "error": "Live center frame missing"}
              
-        center_match = cv_engine.verify_identity(
+        center_match = await asyncio.to_thread(
+            cv_engine.verify_identity,
             session["profile_photo_path"],
             center_frame_path
         )
@@ -0,0 +1,162 @@
+import logging
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    import sherpa_onnx
+except ImportError:
+    sherpa_onnx = None
+
+logger = logging.getLogger(__name__)
+
+VAD_SAMPLE_RATE = 16000
+
+# (start offset in samples, float32 samples)
+Segment = Tuple[int, np.ndarray]
+
+
+class SileroSegmenter:
+    """Speech segmentation with the Silero VAD model through sherpa-onnx."""
+
+    def __init__(self, model_path: str, threshold: float = 0.5, min_silence: float = 0.5,
+                 min_speech: float = 0.25, max_speech: float = 20.0):
+        config = sherpa_onnx.VadModelConfig()
+        config.silero_vad.model = model_path
+        config.silero_vad.threshold = threshold
+        config.silero_vad.min_silence_duration = min_silence
+        config.silero_vad.min_speech_duration = min_speech
+        config.silero_vad.max_speech_duration = max_speech
+        config.sample_rate = VAD_SAMPLE_RATE
+        config.num_threads = 1
+        self.window_size = config.silero_vad.window_size
+        self.vad = sherpa_onnx.VoiceActivityDetector(config, buffer_size_in_seconds=max_speech + 10)
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    @property
+    def in_speech(self) -> bool:
+        return self.vad.is_speech_detected()
+
+    def accept(self, samples: np.ndarray) -> List[Segment]:
+        # Silero expects whole windows; carry the remainder to the next call
+        self._pending = np.concatenate([self._pending, samples])
+        usable = len(self._pending) - len(self._pending) % self.window_size
+        segments = []
+        for start in range(0, usable, self.window_size):
+            self.vad.accept_waveform(self._pending[start:start + self.window_size])
+            # Drain as we go so long inputs never overflow the VAD's segment buffer
+            segments.extend(self._drain())
+        self._pending = self._pending[usable:]
+        return segments
+
+    def flush(self) -> List[Segment]:
+        if len(self._pending):
+            self.vad.accept_waveform(self._pending)
+            self._pending = np.zeros(0, dtype=np.float32)
+        self.vad.flush()
+        return self._drain()
+
+    def _drain(self) -> List[Segment]:
+        segments = []
+        while not self.vad.empty():
+            segment = self.vad.front
+            segments.append((segment.start, np.asarray(segment.samples, dtype=np.float32)))
+            self.vad.pop()
+        return segments
+
+
+class EnergySegmenter:
+    """
+    Fallback segmentation when the Silero model is unavailable: 30 ms frames are
+    speech when their RMS clears an adaptive noise floor, with a silence hangover.
+    """
+
+    FRAME = 480  # 30 ms at 16 kHz
+
+    def __init__(self, min_silence: float = 0.5, min_speech: float = 0.25, max_speech: float = 20.0,
+                 ratio: float = 3.0, min_rms: float = 0.01):
+        self.min_silence_frames = int(min_silence * VAD_SAMPLE_RATE / self.FRAME)
+        self.min_speech_samples = int(min_speech * VAD_SAMPLE_RATE)
+        self.max_speech_samples = int(max_speech * VAD_SAMPLE_RATE)
+        self.pre_roll = int(0.2 * VAD_SAMPLE_RATE)
+        self.ratio = ratio
+        self.min_rms = min_rms
+
+        self.noise_floor = min_rms / ratio
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._history = np.zeros(0, dtype=np.float32)  # recent non-speech audio, for pre-roll
+        self._speech: List[np.ndarray] = []
+        self._speech_start = 0
+        self._silent_frames = 0
+        self._voiced_frames = 0
+        self._offset = 0  # samples consumed so far
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._speech)
+
+    def accept(self, samples: np.ndarray) -> List[Segment]:
+        self._pending = np.concatenate([self._pending, samples])
+        count = len(self._pending) // self.FRAME
+        if not count:
+            return []
+        frames = self._pending[:count * self.FRAME].reshape(count, self.FRAME)
+        self._pending = self._pending[count * self.FRAME:]
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+        segments = []
+        for frame, level in zip(frames, rms):
+            voiced = level > max(self.min_rms, self.noise_floor * self.ratio)
+            if not voiced:
+                # Track the noise floor on non-speech frames only
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * level
+            if self._speech:
+                self._speech.append(frame)
+                self._silent_frames = 0 if voiced else self._silent_frames + 1
+                self._voiced_frames += int(voiced)
+                length = len(self._speech) * self.FRAME
+                if self._silent_frames >= self.min_silence_frames or length >= self.max_speech_samples:
+                    segments.extend(self._close())
+            elif voiced:
+                self._speech_start = self._offset - len(self._history)
+                self._speech = [self._history, frame]
+                self._history = np.zeros(0, dtype=np.float32)
+                self._silent_frames = 0
+                self._voiced_frames = 1
+            else:
+                self._history = np.concatenate([self._history, frame])[-self.pre_roll:]
+            self._offset += self.FRAME
+        return segments
+
+    def flush(self) -> List[Segment]:
+        if self._speech and len(self._pending):
+            self._speech.append(self._pending)
+        self._pending = np.zeros(0, dtype=np.float32)
+        return self._close() if self._speech else []
+
+    def _close(self) -> List[Segment]:
+        audio = np.concatenate(self._speech)
+        # Keep a little of the trailing silence, drop the rest
+        trim = max(0, self._silent_frames - 3) * self.FRAME
+        audio = audio[:len(audio) - trim] if trim else audio
+        start = max(0, self._speech_start)
+        voiced = self._voiced_frames * self.FRAME
+        self._speech = []
+        self._silent_frames = 0
+        self._voiced_frames = 0
+        # Clicks and coughs: too little voiced audio to be an utterance
+        if voiced < self.min_speech_samples:
+            return []
+        return [(start, audio)]
+
+
+def build_segmenter(model_path: str, threshold: float = 0.5, min_silence: float = 0.5,
+                    min_speech: float = 0.25, max_speech: float = 20.0):
+    """Silero VAD when its model is present, otherwise the energy-based fallback."""
+    if sherpa_onnx is not None and os.path.exists(model_path):
+        try:
+            return SileroSegmenter(model_path, threshold, min_silence, min_speech, max_speech)
+        except Exception as e:
+            logger.warning(f"Failed to initialize Silero VAD, using energy VAD: {e}")
+    return EnergySegmenter(min_silence, min_speech, max_speech)
@@ -0,0 +1,211 @@
+import os
+import queue
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import lancedb
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _is_commit_conflict(error: Exception) -> bool:
+    # Lance reports a lost optimistic-concurrency race as a (retryable) commit conflict
+    return "conflict" in str(error).lower()
+
+
+class TableRegistry:
+    """
+    Opens each LanceDB table once per process and hands out the cached handle,
+    instead of listing tables and re-opening on every request. Handles refresh
+    to the latest committed version every `read_consistency_interval`, so rows
+    written by other worker processes become visible.
+    """
+
+    def __init__(self, path: str, read_consistency_seconds: float = 5.0):
+        os.makedirs(path, exist_ok=True)
+        self.db = lancedb.connect(path, read_consistency_interval=timedelta(seconds=read_consistency_seconds))
+        self._tables: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[Any]:
+        """The open table, or None if it does not exist yet."""
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+        with self._lock:
+            if name not in self._tables:
+                if name not in self.db.table_names():
+                    return None
+                self._tables[name] = self.db.open_table(name)
+            return self._tables[name]
+
+    def append(self, name: str, rows: List[dict]):
+        """Adds rows in one commit, creating the table from them if needed."""
+        table = self.get(name)
+        if table is not None:
+            table.add(rows)
+            return
+        with self._lock:
+            try:
+                self._tables[name] = self.db.create_table(name, data=rows)
+                return
+            except Exception:
+                # Another process created it first; fall through to a plain append
+                if name not in self.db.table_names():
+                    raise
+                self._tables[name] = self.db.open_table(name)
+        self._tables[name].add(rows)
+
+    def names(self) -> List[str]:
+        return sorted(self._tables)
+
+
+class WriteBehindWriter:
+    """
+    Single writer thread in front of LanceDB. Callers enqueue rows and get a future;
+    rows are buffered per table and committed together once `batch_rows` are pending
+    or the oldest has waited `flush_seconds`. Each future resolves when the commit
+    holding its rows has landed (the durability acknowledgement), or fails with the
+    commit's error. One commit per batch instead of per resume keeps the number of
+    Lance fragments down and leaves far fewer commits to race with other workers;
+    a commit that still loses such a race is retried. If a batch fails for any other
+    reason, each caller's rows are committed separately so only the offender fails.
+    """
+
+    def __init__(self, registry: TableRegistry, batch_rows: int = 64, flush_seconds: float = 1.0,
+                 retries: int = 3):
+        self.registry = registry
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.retries = retries
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.commits = 0
+        self.rows_written = 0
+        self.failed_commits = 0
+        self.total_ack_ms = 0.0
+        self.max_ack_ms = 0.0
+        self.acks = 0
+
+    def write(self, table: str, rows: List[dict]) -> Future:
+        """Thread-safe. Await from asyncio with asyncio.wrap_future(), or block on .result()."""
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((table, rows, future, time.monotonic()))
+        return future
+
+    def shutdown(self, timeout: float = 10.0):
+        """Commits everything still buffered, then stops the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="lancedb-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        # table -> [(rows, future, enqueued)]
+        pending: Dict[str, List[tuple]] = {}
+        while True:
+            deadline = min((entries[0][2] + self.flush_seconds for entries in pending.values()), default=None)
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                for table, entries in pending.items():
+                    self._commit(table, entries)
+                return
+            if item is not None:
+                table, rows, future, enqueued = item
+                pending.setdefault(table, []).append((rows, future, enqueued))
+
+            now = time.monotonic()
+            for table in list(pending):
+                entries = pending[table]
+                buffered = sum(len(rows) for rows, _, _ in entries)
+                if buffered >= self.batch_rows or now - entries[0][2] >= self.flush_seconds:
+                    self._commit(table, pending.pop(table))
+
+    def _commit(self, table: str, entries: List[tuple]):
+        rows = [row for batch, _, _ in entries for row in batch]
+        error = self._append(table, rows)
+        if error is not None and len(entries) > 1:
+            # One caller's rows (e.g. a profile that doesn't fit the schema) must not fail
+            # everyone batched with it: commit each caller's rows on their own
+            logger.warning(f"LanceDB batch of {len(rows)} rows to {table} failed, committing per caller: {error}")
+            errors = [self._append(table, batch) for batch, _, _ in entries]
+        else:
+            errors = [error] * len(entries)
+
+        finished = time.monotonic()
+        with self._lock:
+            for _, _, enqueued in entries:
+                ack_ms = (finished - enqueued) * 1000
+                self.acks += 1
+                self.total_ack_ms += ack_ms
+                self.max_ack_ms = max(self.max_ack_ms, ack_ms)
+
+        for (batch, future, _), error in zip(entries, errors):
+            if error is None:
+                future.set_result(len(batch))
+            else:
+                future.set_exception(error)
+
+    def _append(self, table: str, rows: List[dict]) -> Optional[Exception]:
+        """One commit; returns its error. Only commit conflicts (nothing was written) are retried."""
+        for attempt in range(self.retries):
+            try:
+                self.registry.append(table, rows)
+            except Exception as e:
+                if not _is_commit_conflict(e) or attempt == self.retries - 1:
+                    logger.error(f"LanceDB commit of {len(rows)} rows to {table} failed: {e}")
+                    with self._lock:
+                        self.failed_commits += 1
+                    return e
+                logger.warning(f"LanceDB commit conflict on {table} (attempt {attempt + 1}), retrying")
+                time.sleep(0.1 * 2 ** attempt)
+            else:
+                with self._lock:
+                    self.commits += 1
+                    self.rows_written += len(rows)
+                return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "commits": self.commits,
+                "rows_written": self.rows_written,
+                "failed_commits": self.failed_commits,
+                "avg_rows_per_commit": round(self.rows_written / self.commits, 1) if self.commits else 0.0,
+                "avg_ack_ms": round(self.total_ack_ms / self.acks, 1) if self.acks else 0.0,
+                "max_ack_ms": round(self.max_ack_ms, 1),
+                "open_tables": self.registry.names(),
+            }
+
+
+lance_tables = TableRegistry(settings.LANCEDB_PATH, read_consistency_seconds=settings.LANCEDB_READ_CONSISTENCY_SECONDS)
+lance_writer = WriteBehindWriter(
+    lance_tables,
+    batch_rows=settings.LANCEDB_WRITE_BATCH_ROWS,
+    flush_seconds=settings.LANCEDB_WRITE_FLUSH_SECONDS,
+)
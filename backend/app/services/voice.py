@@ -1,9 +1,20 @@
+import asyncio
 import logging
 import numpy as np
 import soundfile as sf
 import io
 import os
+import struct
+import hashlib
+import unicodedata
 import onnxruntime as ort
+from importlib import metadata
+from typing import Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.cache import LRUCache, BinaryDiskCache
+from app.services.inference_pool import InferencePool
+from app.services.moonshine import load_moonshine
 
 try:
     from kokoro_onnx import Kokoro
@@ -17,6 +28,7 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
 class VoiceService:
     def __init__(self, models_dir="app/models"):
         self.tts = None
@@ -26,57 +38,233 @@ class VoiceService:
         # kokoro-onnx 0.5.0 uses voices.bin
         voices_path = os.path.join(models_dir, "voices.bin")
         moonshine_dir = os.path.join(models_dir, "sherpa-onnx-moonshine-tiny-en-int8")
+        self.moonshine_dir = moonshine_dir
+        # Silero VAD for streaming input (optional; an energy VAD is used without it)
+        self.vad_model_path = os.path.join(models_dir, "silero_vad.onnx")
+
+        # Synthesized-phrase cache: memory LRU in front of a disk tier, keyed on
+        # normalized text, voice, speed and the model/package version
+        self.tts_model_version = "none"
+        # Bounded by bytes too: whole long texts from /speak can be minutes of audio
+        self.tts_cache = LRUCache(
+            max_entries=settings.VOICE_TTS_CACHE_MEMORY_ENTRIES,
+            max_bytes=settings.VOICE_TTS_CACHE_MEMORY_MB * 1024 * 1024,
+            sizeof=lambda entry: entry[0].nbytes,
+        )
+        self.tts_cache_l2 = None
+        if settings.VOICE_TTS_CACHE_DISK_MB > 0:
+            self.tts_cache_l2 = BinaryDiskCache(settings.VOICE_TTS_CACHE_DIR, max_bytes=settings.VOICE_TTS_CACHE_DISK_MB * 1024 * 1024)
+
+        # Each pool worker owns its own session, so concurrent interviews run in
+        # parallel instead of serializing on one engine or blocking the event loop
+        tts_engines = []
+        stt_engines = []
 
         # Initialize TTS (Kokoro)
         if Kokoro and os.path.exists(kokoro_path) and os.path.exists(voices_path):
             try:
-                # Force CPU provider to avoid onnxruntime auto-detection issues
-                sess = ort.InferenceSession(kokoro_path, providers=['CPUExecutionProvider'])
-                self.tts = Kokoro.from_session(sess, voices_path)
-                logger.info("✔ Kokoro (TTS) initialized successfully")
+                for _ in range(settings.VOICE_TTS_WORKERS):
+                    options = ort.SessionOptions()
+                    options.intra_op_num_threads = settings.VOICE_TTS_INTRA_OP_THREADS
+                    options.inter_op_num_threads = settings.VOICE_TTS_INTER_OP_THREADS
+                    # Force CPU provider to avoid onnxruntime auto-detection issues
+                    sess = ort.InferenceSession(kokoro_path, sess_options=options, providers=['CPUExecutionProvider'])
+                    tts_engines.append(Kokoro.from_session(sess, voices_path))
+                self.tts_model_version = self._tts_model_version(kokoro_path, voices_path)
+                logger.info(f"✔ Kokoro (TTS) initialized successfully ({len(tts_engines)} sessions)")
             except Exception as e:
                 logger.warning(f"Failed to initialize Kokoro (TTS): {e}")
 
         # Initialize STT (Sherpa-ONNX Moonshine)
         if sherpa_onnx and os.path.exists(moonshine_dir):
             try:
-                self.stt = sherpa_onnx.OfflineRecognizer.from_moonshine(
-                    preprocessor=os.path.join(moonshine_dir, "preprocess.onnx"),
-                    encoder=os.path.join(moonshine_dir, "encode.int8.onnx"),
-                    uncached_decoder=os.path.join(moonshine_dir, "uncached_decode.int8.onnx"),
-                    cached_decoder=os.path.join(moonshine_dir, "cached_decode.int8.onnx"),
-                    tokens=os.path.join(moonshine_dir, "tokens.txt"),
-                )
-                logger.info("✔ Sherpa-ONNX (Moonshine STT) initialized")
+                for _ in range(settings.VOICE_STT_WORKERS):
+                    stt_engines.append(load_moonshine(moonshine_dir, settings.VOICE_STT_THREADS))
+                logger.info(f"✔ Sherpa-ONNX (Moonshine STT) initialized ({len(stt_engines)} recognizers)")
             except Exception as e:
                 logger.warning(f"Failed to initialize Sherpa-ONNX (STT): {e}")
 
+        self.tts = tts_engines[0] if tts_engines else None
+        self.stt = stt_engines[0] if stt_engines else None
+        self.tts_pool = InferencePool("tts", tts_engines)
+        self.stt_pool = InferencePool("stt", stt_engines)
+
+    @staticmethod
+    def _tts_model_version(kokoro_path: str, voices_path: str) -> str:
+        try:
+            package = metadata.version("kokoro-onnx")
+        except metadata.PackageNotFoundError:
+            package = "unknown"
+        sizes = f"{os.path.getsize(kokoro_path)}:{os.path.getsize(voices_path)}"
+        return f"{os.path.basename(kokoro_path)}:{sizes}:kokoro-onnx-{package}"
+
+    def tts_cache_key(self, text: str, voice: str, speed: float) -> str:
+        normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+        parts = [normalized, voice, f"{speed:.3f}", self.tts_model_version]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def _cached_audio(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        entry = self.tts_cache.get(key)
+        if entry is None and self.tts_cache_l2 is not None:
+            data = self.tts_cache_l2.get(key)
+            if data is not None:
+                sample_rate, = struct.unpack_from("<I", data)
+                entry = (np.frombuffer(data, dtype="<i2", offset=4), sample_rate)
+                self.tts_cache.set(key, entry)
+        if entry is None:
+            return None
+        pcm, sample_rate = entry
+        return pcm.astype(np.float32) / 32768.0, sample_rate
+
+    def _store_audio(self, key: str, samples: np.ndarray, sample_rate: int):
+        # WAV output is PCM16 anyway, so caching 16-bit samples loses nothing
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+        self.tts_cache.set(key, (pcm, sample_rate))
+        if self.tts_cache_l2 is not None:
+            self.tts_cache_l2.set(key, struct.pack("<I", sample_rate) + pcm.tobytes())
+
+    def _render(self, engine, key: str, text: str, voice: str, speed: float) -> Tuple[np.ndarray, int]:
+        # Runs on a TTS worker; the disk tier is checked here, off the event loop
+        cached = self._cached_audio(key)
+        if cached is not None:
+            return cached
+        samples, sample_rate = engine.create(text, voice=voice, speed=speed)
+        self._store_audio(key, samples, sample_rate)
+        return samples, sample_rate
+
+    def _tts_future(self, text: str, voice: str, speed: float):
+        if not self.tts:
+            raise RuntimeError("TTS engine not initialized")
+        key = self.tts_cache_key(text, voice, speed)
+        return self.tts_pool.submit(self._render, key, text, voice, speed)
+
+    def synthesize(self, text: str, voice="af_heart", speed: float = 1.0) -> Tuple[np.ndarray, int]:
+        """Kokoro output (cached): float32 samples and their sample rate. Blocks; raises on failure."""
+        return self._tts_future(text, voice, speed).result()
+
+    async def synthesize_async(self, text: str, voice="af_heart", speed: float = 1.0) -> Tuple[np.ndarray, int]:
+        """Like synthesize, but queued on the TTS pool without tying up a thread or the event loop."""
+        if self.tts:
+            hit = self.tts_cache.get(self.tts_cache_key(text, voice, speed))
+            if hit is not None:
+                pcm, sample_rate = hit
+                return pcm.astype(np.float32) / 32768.0, sample_rate
+        return await asyncio.wrap_future(self._tts_future(text, voice, speed))
+
+    def warm_up(self, phrases: Iterable[str], voice="af_heart", speed: float = 1.0) -> int:
+        """
+        Pre-renders phrases into the TTS cache. Returns how many were synthesized.
+        Phrases are queued one at a time so live requests never wait behind a warm-up batch.
+        """
+        if not self.tts:
+            return 0
+        rendered = 0
+        for phrase in phrases:
+            if self._cached_audio(self.tts_cache_key(phrase, voice, speed)) is not None:
+                continue
+            try:
+                self.synthesize(phrase, voice=voice, speed=speed)
+            except Exception as e:
+                logger.warning(f"TTS warm-up failed for {phrase!r}: {e}")
+                continue
+            rendered += 1
+        return rendered
+
+    def tts_cache_stats(self) -> dict:
+        return {
+            "memory": self.tts_cache.stats(),
+            "disk": self.tts_cache_l2.stats() if self.tts_cache_l2 is not None else None,
+        }
+
+    @staticmethod
+    def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+        buffer = io.BytesIO()
+        sf.write(buffer, samples, sample_rate, format='WAV')
+        return buffer.getvalue()
+
     def speak(self, text: str, voice="af_heart") -> bytes:
         if not self.tts:
             logger.error("TTS engine not initialized")
             return b""
             
         try:
-            samples, sample_rate = self.tts.create(text, voice=voice, speed=1.0)
-            buffer = io.BytesIO()
-            sf.write(buffer, samples, sample_rate, format='WAV')
-            return buffer.getvalue()
+            samples, sample_rate = self.synthesize(text, voice=voice)
+            return self.encode_wav(samples, sample_rate)
         except Exception as e:
             logger.error(f"Error in speak: {e}")
             return b""
 
+    async def speak_async(self, text: str, voice="af_heart") -> bytes:
+        if not self.tts:
+            logger.error("TTS engine not initialized")
+            return b""
+
+        try:
+            samples, sample_rate = await self.synthesize_async(text, voice=voice)
+            return await asyncio.to_thread(self.encode_wav, samples, sample_rate)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in speak_async: {e}")
+            return b""
+
+    @staticmethod
+    def _decode(engine, samples: np.ndarray, sample_rate: int) -> str:
+        stream = engine.create_stream()
+        stream.accept_waveform(sample_rate, samples)
+        engine.decode_stream(stream)
+        return stream.result.text
+
+    def _stt_future(self, samples: np.ndarray, sample_rate: int):
+        if not self.stt:
+            raise RuntimeError("STT engine not initialized")
+        return self.stt_pool.submit(self._decode, samples, sample_rate)
+
+    def recognize(self, samples: np.ndarray, sample_rate: int) -> str:
+        """Decodes float32 mono samples with Moonshine. Blocks; raises on failure."""
+        return self._stt_future(samples, sample_rate).result()
+
+    async def recognize_async(self, samples: np.ndarray, sample_rate: int) -> str:
+        return await asyncio.wrap_future(self._stt_future(samples, sample_rate))
+
+    @classmethod
+    def _decode_file(cls, engine, audio_bytes: bytes) -> str:
+        # Runs on an STT worker, so parsing the uploaded file stays off the event loop
+        audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+        return cls._decode(engine, audio_data, sample_rate)
+
     def listen(self, audio_bytes: bytes) -> str:
         if not self.stt:
             return "[STT Engine Not Loaded]"
             
         try:
-            audio_data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
-            stream = self.stt.create_stream()
-            stream.accept_waveform(sample_rate, audio_data)
-            self.stt.decode_stream(stream)
-            return stream.result.text
+            return self.stt_pool.submit(self._decode_file, audio_bytes).result()
         except Exception as e:
             logger.error(f"Error in listen: {e}")
             return ""
 
+    async def listen_async(self, audio_bytes: bytes) -> str:
+        if not self.stt:
+            return "[STT Engine Not Loaded]"
+
+        try:
+            return await asyncio.wrap_future(self.stt_pool.submit(self._decode_file, audio_bytes))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in listen_async: {e}")
+            return ""
+
+    def transcribe(self, audio_path: str) -> dict:
+        """
+        Long-form transcription of a recorded file: split at silence, decode segments
+        in parallel, merge into {"text", "language", "probability", "segments", ...}.
+        """
+        # Imported here because the transcription module builds on this one
+        from app.services.transcription import long_form_transcriber
+        return long_form_transcriber.transcribe(audio_path)
+
+    def pool_stats(self) -> dict:
+        return {"tts": self.tts_pool.stats(), "stt": self.stt_pool.stats()}
+
 voice_service = VoiceService()
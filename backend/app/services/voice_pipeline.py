@@ -0,0 +1,240 @@
+import asyncio
+import contextlib
+import logging
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.voice import voice_service
+from app.services.vad import VAD_SAMPLE_RATE, build_segmenter
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_END_RE = re.compile(r"[.!?…]+[\"')\]]*\s+")
+# Fallback cut for run-on text: after a clause separator
+_CLAUSE_END_RE = re.compile(r"[,;:—]\s+")
+
+_DONE = object()
+
+
+class SentenceBuffer:
+    """
+    Accumulates streamed LLM tokens and releases complete sentences.
+    Fragments shorter than `min_chars` are held back and joined with the next
+    sentence (Kokoro prosody is poor on one-word clips); text longer than
+    `max_chars` without a sentence end is cut at the last clause separator.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        self._buffer += token
+        sentences = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                return sentences
+            sentence, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> Optional[str]:
+        sentence, self._buffer = self._buffer.strip(), ""
+        return sentence or None
+
+    def _next_cut(self) -> Optional[int]:
+        for match in _SENTENCE_END_RE.finditer(self._buffer):
+            if match.end() >= self.min_chars:
+                return match.end()
+        if len(self._buffer) > self.max_chars:
+            clauses = list(_CLAUSE_END_RE.finditer(self._buffer, 0, self.max_chars))
+            return clauses[-1].end() if clauses else self.max_chars
+        return None
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 240) -> List[str]:
+    """Splits a complete text the same way the streaming buffer would."""
+    buffer = SentenceBuffer(min_chars, max_chars)
+    sentences = buffer.feed(text)
+    tail = buffer.flush()
+    return sentences + [tail] if tail else sentences
+
+
+async def speak_stream(tokens: AsyncIterator[str], send_audio: Callable[[int, str, bytes], Awaitable[None]],
+                       voice: str = "af_heart", encode: Callable[[np.ndarray, int], bytes] = None) -> str:
+    """
+    Voices an LLM token stream as it arrives: tokens -> sentences -> Kokoro -> send_audio.
+    The three stages run concurrently, linked by queues, so the first sentence is being
+    synthesized while the model is still generating and audio goes out in order as soon
+    as each sentence is ready. `encode` turns samples into the wire format (WAV by default).
+    Returns the full reply text.
+    """
+    encode = encode or voice_service.encode_wav
+    sentences: asyncio.Queue = asyncio.Queue()
+    # One synthesized sentence may wait while the next is rendered
+    audio: asyncio.Queue = asyncio.Queue(maxsize=2)
+    reply: List[str] = []
+
+    async def produce():
+        buffer = SentenceBuffer()
+        try:
+            async for token in tokens:
+                reply.append(token)
+                for sentence in buffer.feed(token):
+                    sentences.put_nowait(sentence)
+            tail = buffer.flush()
+            if tail:
+                sentences.put_nowait(tail)
+        finally:
+            sentences.put_nowait(_DONE)
+
+    async def synthesize():
+        index = 0
+        try:
+            while (sentence := await sentences.get()) is not _DONE:
+                try:
+                    samples, sample_rate = await voice_service.synthesize_async(sentence, voice)
+                    data = await asyncio.to_thread(encode, samples, sample_rate)
+                except Exception as e:
+                    logger.error(f"TTS failed for sentence {index}: {e}")
+                    continue
+                await audio.put((index, sentence, data))
+                index += 1
+        except BaseException:
+            # Cancelled, or send failed: nothing may be draining the queue, so never wait on it
+            with contextlib.suppress(asyncio.QueueFull):
+                audio.put_nowait(_DONE)
+            raise
+        await audio.put(_DONE)
+
+    async def send():
+        nonlocal first_audio_ms
+        while (item := await audio.get()) is not _DONE:
+            if first_audio_ms is None:
+                first_audio_ms = (time.perf_counter() - started) * 1000
+            await send_audio(*item)
+
+    first_audio_ms = None
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(stage()) for stage in (produce, synthesize, send)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    logger.debug(f"Voiced reply: first audio after {first_audio_ms or 0:.0f} ms, "
+                 f"complete after {(time.perf_counter() - started) * 1000:.0f} ms")
+    return "".join(reply)
+
+
+def warm_up(phrases: List[str], voice: str = "af_heart") -> int:
+    """
+    Pre-renders phrases into the TTS cache, both whole (for /speak) and split the
+    way the streaming paths split them, so recurring turns are voiced from cache.
+    """
+    texts: List[str] = []
+    for phrase in phrases:
+        for text in [phrase, *split_sentences(phrase)]:
+            if text not in texts:
+                texts.append(text)
+    rendered = voice_service.warm_up(texts, voice=voice)
+    logger.info(f"TTS warm-up: {rendered} of {len(texts)} phrases synthesized, the rest already cached")
+    return rendered
+
+
+async def synthesize_sentences(text: str, voice: str = "af_heart") -> AsyncIterator[Tuple[np.ndarray, int]]:
+    """
+    Yields Kokoro audio sentence by sentence. The next sentence is synthesized
+    while the caller sends the current one, and at most one sentence of audio
+    is buffered ahead, so memory stays bounded however long the text is.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return
+    pending = asyncio.ensure_future(voice_service.synthesize_async(sentences[0], voice))
+    try:
+        for index in range(len(sentences)):
+            audio = await pending
+            if index + 1 < len(sentences):
+                pending = asyncio.ensure_future(voice_service.synthesize_async(sentences[index + 1], voice))
+            yield audio
+    finally:
+        pending.cancel()
+
+
+class StreamingTranscriber:
+    """
+    Transcribes a live 16 kHz mono stream as it arrives.
+    Audio chunks go through server-side VAD; each speech segment is decoded the
+    moment its endpoint (trailing silence) is detected, and while the speaker is
+    still talking the utterance so far is re-decoded every `partial_interval`
+    seconds of audio to produce partial transcripts.
+    """
+
+    def __init__(self, segmenter, recognize: Callable[[np.ndarray, int], Awaitable[str]], partial_interval: float = 1.0):
+        self.segmenter = segmenter
+        self.recognize = recognize
+        self.partial_samples = int(partial_interval * VAD_SAMPLE_RATE)
+        self._utterance: List[np.ndarray] = []
+        self._since_partial = 0
+
+    async def accept(self, samples: np.ndarray) -> List[Dict[str, str]]:
+        events = await self._finals(self.segmenter.accept(samples))
+        if not self.segmenter.in_speech:
+            self._reset()
+            return events
+
+        self._utterance.append(samples)
+        self._since_partial += len(samples)
+        if self.partial_samples > 0 and self._since_partial >= self.partial_samples:
+            self._since_partial = 0
+            text = await self._decode(np.concatenate(self._utterance))
+            if text:
+                events.append({"type": "partial", "text": text})
+        return events
+
+    async def flush(self) -> List[Dict[str, str]]:
+        """Finalizes whatever speech is buffered (e.g. the client stopped sending)."""
+        events = await self._finals(self.segmenter.flush())
+        self._reset()
+        return events
+
+    async def _finals(self, segments) -> List[Dict[str, str]]:
+        events = []
+        for _, audio in segments:
+            self._reset()
+            text = await self._decode(audio)
+            if text:
+                events.append({"type": "transcript", "text": text})
+        return events
+
+    async def _decode(self, audio: np.ndarray) -> str:
+        try:
+            text = await self.recognize(audio, VAD_SAMPLE_RATE)
+        except Exception as e:
+            logger.error(f"Streaming STT decode failed: {e}")
+            return ""
+        return text.strip()
+
+    def _reset(self):
+        self._utterance = []
+        self._since_partial = 0
+
+
+def build_transcriber() -> StreamingTranscriber:
+    segmenter = build_segmenter(
+        voice_service.vad_model_path,
+        threshold=settings.VOICE_VAD_THRESHOLD,
+        min_silence=settings.VOICE_VAD_MIN_SILENCE_SECONDS,
+        min_speech=settings.VOICE_VAD_MIN_SPEECH_SECONDS,
+        max_speech=settings.VOICE_VAD_MAX_SPEECH_SECONDS,
+    )
+    return StreamingTranscriber(segmenter, voice_service.recognize_async, settings.VOICE_PARTIAL_INTERVAL_SECONDS)